@@ -1,14 +1,132 @@
 from core.languages import cpp
-from core.misc import helper, EUtil, logger
-import yaml
+from core.misc import helper, EUtil, logger, cache, profiles, runner
+import argparse
 import os
 
+
+def build(ELangObject, config, checkup, buildCache):
+    '''
+    Translates the project and builds its binary, returns True on success
+    '''
+    compileCode = ELangObject.compile()
+
+    # Skip g++ when this exact program was already built with this compiler
+    key = buildCache.key(ELangObject.digest)
+    binary = cache.binary_path(config['Name'])
+    profiler = ELangObject.profiler
+    if buildCache.restore(key, binary):
+        print(helper.bcolors.OKBLUE + "\nRESTORED {} FROM BUILD CACHE!".format(binary))
+        if profiler:
+            profiler.record("compiler", 0.0, cached=True)
+        return True
+
+    if config.get('Profile') == "pgo":
+        # Instrumented build, training run and the final build in one go
+        result = profiles.pgo_build(checkup.runner, compileCode[0], config, binary, checkup.logger, ELangObject.code)
+    else:
+        result = checkup.runner.run(compileCode[0], input=ELangObject.code)
+    if profiler:
+        profiler.record("compiler", result.elapsed, returncode=result.returncode, timed_out=result.timed_out)
+
+    if checkup.report(result):
+        buildCache.store(key, binary)
+        return True
+    return False
+
+
+def profiled(ELangObject, config, checkup, buildCache, path):
+    '''
+    Builds and, when profiling, writes the report of this build to path
+    '''
+    reply = build(ELangObject, config, checkup, buildCache)
+    if ELangObject.profiler:
+        ELangObject.profiler.write(path)
+        ELangObject.profiler.clear()
+    return reply
+
+
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(description="ELang compiler")
+    parser.add_argument("files", nargs="*",
+                        help="build these .elpp files or directories of them instead of the project")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="number of programs translated and compiled at once")
+    parser.add_argument("--report", default=None,
+                        help="write the batch report as JSON to this file")
+    parser.add_argument("--watch", action="store_true",
+                        help="stay running and rebuild whenever the code or config.yml change")
+    parser.add_argument("--interval", type=float, default=0.5,
+                        help="seconds between checks for changes in watch mode")
+    parser.add_argument("--no-clear", action="store_true",
+                        help="do not clear the terminal before starting")
+    parser.add_argument("--interpret", action="store_true",
+                        help="run the program right away with the interpreter instead of building it")
+    parser.add_argument("--profile", nargs="?", const="-", default=None, metavar="FILE",
+                        help="write time, statements and peak memory of every phase as JSON to FILE, or to stderr")
+    parser.add_argument("--cprofile", default=None, metavar="FILE",
+                        help="with --profile, also dump cProfile stats of the translator to FILE")
+    args = parser.parse_args()
+
     checkup = helper.Checkup(logger.Log(), EUtil)
-    details = checkup.init()
-    if details['config']['language'] == "c++": # Here details['config'] might give 
-                                               # error in IDEs, but it works!
-        ELangObject = cpp.ELang(details['config'], logger.Log, helper.bcolors())
-        compileCode = ELangObject.compile()
-        checkup.command(compileCode[0])
\ No newline at end of file
+    if args.files:
+        # A batch only reads the configuration, it never generates a project
+        details = {"config": checkup.settings(), "code": True}
+    else:
+        details = checkup.init(clear=not args.no_clear)
+    if not details['config']:
+        # What is wrong with it was already shown
+        exit(1)
+    checkup.runner = runner.Runner(details['config'].get('Timeout'))
+    logger.configure(details['config'].get('LogLevel'))
+
+    if args.files:
+        from core.misc import batch
+        Batch = batch.Batch(details['config'], args.jobs)
+        if not Batch.report(Batch.run(args.files), args.report):
+            exit(1)
+
+    elif args.interpret or details['config']['language'] == "interpret":
+        from core.languages import interpret
+        ELangObject = interpret.ELang(details['config'], logger.Log, helper.bcolors())
+        exit(ELangObject.interpret())
+
+    elif details['config']['language'] == "c++": # Here details['config'] might give
+                                                 # error in IDEs, but it works!
+        config = details['config']
+        ELangObject = cpp.ELang(config, logger.Log, helper.bcolors())
+        buildCache = cache.BuildCache(config)
+        ELangObject.build_cache = buildCache
+        if args.profile:
+            from core.misc import profiler
+            ELangObject.profiler = profiler.Profiler(cprofile=args.cprofile)
+        profiled(ELangObject, config, checkup, buildCache, args.profile)
+
+        if args.watch:
+            from core.misc import watch
+            PATH_TO_CONFIG = os.path.join(os.getcwd(), 'config.yml')
+            # Included files are watched too, as found by the last build
+            watcher = watch.Watcher([PATH_TO_CONFIG] + ELangObject.sources, args.interval)
+            print(helper.bcolors.HEADER + "\n    [[ WATCHING FOR CHANGES, CTRL+C TO STOP ]]    ")
+
+            try:
+                while True:
+                    changed = watcher.wait()
+                    if PATH_TO_CONFIG in changed:
+                        # Only a changed configuration is loaded again
+                        try:
+                            config = checkup.load(PATH_TO_CONFIG)
+                        except Exception as e:
+                            print(helper.bcolors.FAIL + "\nERROR: CAN'T READ CONFIGURATION AT {}! ERROR: {}".format(PATH_TO_CONFIG, e))
+                            continue
+                        logger.configure(config.get('LogLevel'))
+                        ELangObject.reset(config)
+                        buildCache = cache.BuildCache(config)
+                        ELangObject.build_cache = buildCache
+                        checkup.runner = runner.Runner(config.get('Timeout'))
+                    profiled(ELangObject, config, checkup, buildCache, args.profile)
+                    if watcher.paths != [PATH_TO_CONFIG] + ELangObject.sources:
+                        watcher.watch([PATH_TO_CONFIG] + ELangObject.sources)
+                    print(helper.bcolors.HEADER + "\n    [[ WATCHING FOR CHANGES, CTRL+C TO STOP ]]    ")
+            except KeyboardInterrupt:
+                pass
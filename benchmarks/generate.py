@@ -0,0 +1,193 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Generator of synthetic ELang programs for benchmarking the compiler.
+    Programs are valid: every variable is declared before it is used and
+    every function is defined before it is called.
+
+    For license, Please refer to LICENSE file in the master branch.
+
+    Usage: python -m benchmarks.generate 10000 -o big.elpp --mix show=1,if=3
+'''
+
+import argparse
+import random
+
+from core.languages import cpp
+
+# Relative weight of every kind of statement in a default program
+MIX = {
+    "show": 3,
+    "variable": 3,
+    "arithmetic": 4,
+    "if": 1,
+    "define": 1,
+    "read": 1,
+    "write": 1
+}
+
+# Keywords every kind of statement is made of
+KEYWORDS = {
+    "show": ["show"],
+    "variable": ["variable"],
+    "arithmetic": ["add", "subtract", "multiply", "divide"],
+    "if": ["if", "end"],
+    "define": ["define", "end", "function"],
+    "read": ["read"],
+    "write": ["write", "append"]
+}
+
+
+def parse_mix(text):
+    '''
+    Turns "show=2,if=1" into a mix, kinds not named keep a weight of 0
+    '''
+    mix = dict.fromkeys(MIX, 0)
+    for part in text.split(","):
+        kind, weight = part.split("=")
+        if kind not in MIX:
+            raise ValueError("UNKNOWN STATEMENT KIND {}! MUST BE ONE OF: {}".format(kind, ", ".join(MIX)))
+        mix[kind] = int(weight)
+    return mix
+
+
+class Generator():
+    '''
+    This is a class for writing random programs of a given size and mix
+    '''
+    def __init__(self, mix=None, seed=0):
+        self.mix = mix or MIX
+        self.random = random.Random(seed)
+        self.kinds = [i for i in self.mix if self.mix[i] > 0]
+        self.weights = [self.mix[i] for i in self.kinds]
+
+        # Only keywords the language knows are generated
+        features = cpp.ELang.features
+        for kind in self.kinds:
+            for keyword in KEYWORDS[kind]:
+                if keyword not in features:
+                    raise ValueError("KEYWORD {} IS NOT AN ELANG FEATURE!".format(keyword))
+
+        # Variables holding a number, constants were declared with one and
+        # can be substituted by subtract, multiply and divide
+        self.numbers = []
+        self.constants = []
+        self.strings = []
+        self.count = 0
+
+    def name(self, prefix):
+        self.count += 1
+        return prefix + str(self.count)
+
+    def number(self, names=None):
+        if names == None:
+            names = self.numbers
+        if names and self.random.random() < 0.7:
+            return self.random.choice(names)
+        return str(self.random.randint(1, 100))
+
+    def string(self):
+        '''
+        Returns a string variable, declaring one first if there is none yet
+        '''
+        if not self.strings:
+            name = self.name("s")
+            self.strings.append(name)
+            return name, ["variable {} = text {}".format(name, self.count)]
+        return self.random.choice(self.strings), []
+
+    def show(self):
+        if self.numbers and self.random.random() < 0.5:
+            return ["show " + self.random.choice(self.numbers)]
+        return ["show line {}".format(self.count)]
+
+    def variable(self):
+        if self.random.random() < 0.5:
+            name = self.name("s")
+            self.strings.append(name)
+            return ["variable {} = text {}".format(name, self.count)]
+        name = self.name("n")
+        self.numbers.append(name)
+        self.constants.append(name)
+        return ["variable {} = {}".format(name, self.random.randint(1, 1000))]
+
+    def arithmetic(self):
+        name = self.name("n")
+        keyword = self.random.choice(KEYWORDS["arithmetic"])
+        word = {"add": "and", "subtract": "from", "multiply": "by", "divide": "by"}[keyword]
+        names = self.numbers if keyword == "add" else self.constants
+        # Divisions divide the second operand by the first, which is never 0
+        if keyword == "divide":
+            left = str(self.random.randint(1, 9))
+        else:
+            left = self.number(names)
+        line = "{} {} {} {} in {}".format(keyword, left, word, self.number(names), name)
+        self.numbers.append(name)
+        return [line]
+
+    def if_block(self):
+        op = self.random.choice(["==", "!=", "<", ">", "<=", ">="])
+        return [
+            "if {} {} {} then".format(self.number(), op, self.number()),
+            "show inside {}".format(self.count),
+            "end"
+        ]
+
+    def define(self):
+        name = self.name("f")
+        argument, lines = self.string()
+        return lines + [
+            "define {} with a".format(name),
+            "show a",
+            "end",
+            "function {} {}".format(name, argument)
+        ]
+
+    def read(self):
+        name = self.name("s")
+        self.strings.append(name)
+        return ["read data{}.txt to {}".format(self.count, name)]
+
+    def write(self):
+        argument, lines = self.string()
+        keyword = self.random.choice(KEYWORDS["write"])
+        return lines + ["{} {} to out{}.txt".format(keyword, argument, self.count)]
+
+    def statements(self, size):
+        '''
+        Yields the lines of a program of at least size statements
+        '''
+        makers = {
+            "show": self.show,
+            "variable": self.variable,
+            "arithmetic": self.arithmetic,
+            "if": self.if_block,
+            "define": self.define,
+            "read": self.read,
+            "write": self.write
+        }
+        written = 0
+        while written < size:
+            kind = self.random.choices(self.kinds, self.weights)[0]
+            for line in makers[kind]():
+                yield line + "\n"
+                written += 1
+
+
+def generate(path, size, mix=None, seed=0):
+    '''
+    Writes a program of size statements to path
+    '''
+    with open(path, "w") as f:
+        f.writelines(Generator(mix, seed).statements(size))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic ELang program")
+    parser.add_argument("size", type=int, help="number of statements")
+    parser.add_argument("-o", "--output", default="bench.elpp", help="file to write the program to")
+    parser.add_argument("--mix", default=None, help="weights per kind, like show=2,if=1")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate(args.output, args.size, parse_mix(args.mix) if args.mix else None, args.seed)
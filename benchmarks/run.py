@@ -0,0 +1,189 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Times every phase of the compiler on synthetic programs: reading the
+    file, parsing it, optimizing the IR, generating the code, writing the
+    translation unit and, when asked, g++ itself. Results are written as
+    JSON and can be compared against an earlier run.
+
+    For license, Please refer to LICENSE file in the master branch.
+
+    Usage: python -m benchmarks.run --sizes 1000 10000 --output now.json --baseline before.json
+'''
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks import generate
+from core import optimize
+from core.languages import cpp
+from core.misc import helper, logger, profiles, runner
+
+PHASES = ["read", "parse", "optimize", "generate", "finalize", "g++"]
+
+
+def measure(path, config, gcc=False):
+    '''
+    Translates path once and returns the seconds spent in every phase
+    '''
+    ELangObject = cpp.ELang(config, logger.Log, helper.bcolors())
+    ELangObject.reset()
+    reply = {}
+
+    # The reader announces itself on the terminal, which is not timed
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        start = time.perf_counter()
+        lines = list(ELangObject.reader(path))
+        reply["read"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        program = list(ELangObject.parse(lines))
+        reply["parse"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        program = optimize.run(program, config)
+        reply["optimize"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ELangObject.generate(program)
+        reply["generate"] = time.perf_counter() - start
+
+        code = path[:-len(".elpp")] + ".cpp"
+        start = time.perf_counter()
+        with open(code, "w") as f:
+            ELangObject.finalize(f)
+        reply["finalize"] = time.perf_counter() - start
+
+    if gcc:
+        argv = [config["G++Path"], "-o", config["Name"], code] + profiles.flags(config)
+        result = runner.Runner().run(argv)
+        if not result.ok:
+            raise RuntimeError("G++ FAILED ON {}: {}".format(path, result.stderr))
+        reply["g++"] = result.elapsed
+
+    reply["statements"] = len(program)
+    return reply
+
+
+def bench(sizes, mix=None, repeat=3, gcc=False, config=None, seed=0):
+    '''
+    Generates a program for every size and keeps the fastest of repeat
+    runs of every phase
+    '''
+    folder = tempfile.mkdtemp(prefix="elang-bench-")
+    results = []
+    try:
+        for size in sizes:
+            path = os.path.join(folder, "bench{}.elpp".format(size))
+            generate.generate(path, size, mix, seed)
+
+            program_config = {
+                "FileName": path,
+                "Name": os.path.join(folder, "bench{}".format(size)),
+                "G++Path": "g++",
+                "CompileOnly": True
+            }
+            program_config.update(config or {})
+
+            best = {}
+            for _ in range(repeat):
+                for phase, seconds in measure(path, program_config, gcc).items():
+                    if phase == "statements":
+                        best[phase] = seconds
+                    else:
+                        best[phase] = min(seconds, best.get(phase, seconds))
+            best["total"] = sum(best.get(i, 0) for i in PHASES)
+            results.append({"size": size, "phases": best})
+            print(helper.bcolors.OKBLUE + "BENCHMARKED {} STATEMENTS".format(size) + helper.bcolors.ENDC)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "mix": mix or generate.MIX,
+        "results": results
+    }
+
+
+def compare(report, baseline, threshold=1.25):
+    '''
+    Returns a line for every phase of every size in both reports and the
+    phases that got slower than threshold times the baseline
+    '''
+    before = {i["size"]: i["phases"] for i in baseline["results"]}
+    lines = []
+    slower = []
+    for result in report["results"]:
+        if result["size"] not in before:
+            continue
+        for phase in PHASES + ["total"]:
+            if phase not in result["phases"] or phase not in before[result["size"]]:
+                continue
+            # Totals only compare when both runs timed the same phases
+            if phase == "total" and set(result["phases"]) != set(before[result["size"]]):
+                continue
+            old = before[result["size"]][phase]
+            new = result["phases"][phase]
+            ratio = new / old if old > 0 else 1.0
+            line = "{:>9} {:>9}: {:.4f}s -> {:.4f}s ({:.2f}x)".format(result["size"], phase, old, new, ratio)
+            lines.append(line)
+            if ratio > threshold:
+                slower.append(line)
+    return lines, slower
+
+
+def show(report):
+    columns = PHASES + ["total"]
+    print("{:>9}".format("size") + "".join("{:>10}".format(i) for i in columns))
+    for result in report["results"]:
+        row = "{:>9}".format(result["size"])
+        for phase in columns:
+            if phase in result["phases"]:
+                row += "{:>10.4f}".format(result["phases"][phase])
+            else:
+                row += "{:>10}".format("-")
+        print(row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ELang compiler")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="statements in every generated program")
+    parser.add_argument("--mix", default=None, help="weights per kind, like show=2,if=1")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size, the fastest is kept")
+    parser.add_argument("--gcc", action="store_true", help="also time g++ on the generated code")
+    parser.add_argument("--profile", default="debug", help="build profile used for g++")
+    parser.add_argument("--no-optimize", action="store_true", help="skip the IR optimizations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write the report as JSON to this file")
+    parser.add_argument("--baseline", default=None, help="compare against the JSON report in this file")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="ratio to the baseline above which a phase counts as slower")
+    args = parser.parse_args()
+
+    mix = generate.parse_mix(args.mix) if args.mix else None
+    config = {"Profile": args.profile, "Optimize": not args.no_optimize}
+    report = bench(args.sizes, mix, args.repeat, args.gcc, config, args.seed)
+    show(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        lines, slower = compare(report, baseline, args.threshold)
+        print("\n" + "\n".join(lines))
+        if slower:
+            print(helper.bcolors.FAIL + "\nSLOWER THAN THE BASELINE:\n" + "\n".join(slower) + helper.bcolors.ENDC)
+            sys.exit(1)
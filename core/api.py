@@ -0,0 +1,76 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    ELang as a library. Source text goes in and C++ comes out, without
+    reading or writing files, printing or logging. Every call works on its
+    own translator, so calls can run at the same time from many threads.
+
+    For license, Please refer to LICENSE file in the master branch.
+
+    Usage:
+        from core import api
+        code = api.translate("show Hello World!")
+        binary = api.build("show Hello World!", output="hello")
+'''
+
+import os
+import tempfile
+
+from core.languages import cpp
+from core.misc import helper, logger, profiles, runner
+
+# Settings of a translation when config leaves them out
+DEFAULTS = {
+    "G++Path": "g++",
+    "Flags": "",
+    "Profile": "release",
+    "CompileOnly": False,
+    "Optimize": True,
+    "FastIO": True
+}
+
+
+def settings(config=None):
+    '''
+    Returns a copy of config with the defaults filled in. The prebuilt
+    runtime lives on disk, so the library always pastes the runtime inline.
+    '''
+    reply = dict(DEFAULTS)
+    reply.update(config or {})
+    reply["Runtime"] = "inline"
+    return reply
+
+
+def translate(source, config=None, errors=None):
+    '''
+    Translates ELang source text to C++ and returns the code. Errors in the
+    program are appended to the list errors when one is given.
+    '''
+    ELangObject = cpp.ELang(settings(config), logger.NullLog, helper.bcolors())
+    ELangObject.quiet = True
+    code = ELangObject.translate(source.splitlines(True))
+    if errors != None:
+        errors.extend(ELangObject.errors)
+    return code
+
+
+def build(source, config=None, output=None, errors=None, timeout=None):
+    '''
+    Translates source and compiles it with g++, which reads the code from
+    a pipe. Returns the path of the binary, by default in a new temporary
+    folder owned by the caller. Raises RuntimeError if g++ fails.
+    '''
+    config = settings(config)
+    code = translate(source, config, errors)
+
+    if output == None:
+        output = os.path.join(tempfile.mkdtemp(prefix="elang-"), "program")
+    output = os.path.abspath(output)
+
+    argv = [config["G++Path"], "-x", "c++", "-", "-x", "none", "-o", output] + profiles.flags(config)
+    result = runner.Runner(timeout).run(argv, input=code)
+    if not result.ok:
+        if result.timed_out:
+            raise RuntimeError("G++ TIMED OUT AFTER {:.2f}s!".format(result.elapsed))
+        raise RuntimeError("G++ FAILED WITH EXIT STATUS {}!\n{}".format(result.returncode, result.stderr))
+    return output
@@ -0,0 +1,312 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    The .elpc format: a parsed ELang program, so every tool loads the
+    statements instead of parsing the code again while it is unchanged.
+    The optimized statements are kept in it too, as they only depend on the
+    source and the optimizer. Parsed programs are cached in
+    .elang_cache/elpc, never next to the sources. Running this module makes
+    a .elpc next to its .elpp, to be shipped without its source.
+
+    A file is the magic bytes, the marshal version and the Python version
+    it was written with, followed by a marshalled tuple of the format
+    version, the layout of the statements, the sha256 of the source, the
+    hash of the parser, the errors found while parsing, the statements, the
+    hash of the optimizer and the optimized statements.
+
+    marshal is not safe against data made to attack it, so only load .elpc
+    files from a trusted source, like your own builds.
+
+    For license, Please refer to LICENSE file in the master branch.
+
+    Usage: python -m core.elpc compile.elpp other.elpp
+'''
+
+import hashlib
+import io
+import marshal
+import os
+import sys
+
+from core import ir, optimize
+from core.misc import cache
+
+MAGIC = b"ELPC"
+VERSION = 4
+# marshal data is only read by the marshal and Python that wrote it
+HEADER = MAGIC + bytes([marshal.version] + list(sys.version_info[:2]))
+
+# Every statement is saved as its index in NODES followed by its fields
+NODES = (
+    ir.Show, ir.Var, ir.Add, ir.Sub, ir.Mul, ir.Div, ir.Take, ir.Read,
+    ir.Write, ir.Append, ir.If, ir.End, ir.Define, ir.Call, ir.Change,
+    ir.Native, ir.Run, ir.Foreach, ir.Repeat, ir.Include
+)
+INDEX = {node: index for index, node in enumerate(NODES)}
+
+
+def fields(node):
+    '''
+    Returns the fields of a kind of statement, including inherited ones
+    '''
+    reply = ()
+    for i in reversed(node.__mro__):
+        reply += getattr(i, "__slots__", ())
+    return reply
+
+
+FIELDS = [fields(i) for i in NODES]
+
+# Changing any statement makes older files unreadable instead of wrong
+LAYOUT = hashlib.sha256(repr([(i.__name__, fields(i)) for i in NODES]).encode("utf-8")).hexdigest()
+
+hashes = {}
+
+
+def source_hash(module):
+    if module.__name__ not in hashes:
+        with open(module.__file__, "rb") as f:
+            hashes[module.__name__] = hashlib.sha256(f.read()).hexdigest()
+    return hashes[module.__name__]
+
+
+def optimizer_hash():
+    '''
+    Returns the hash of the optimizer, optimized statements of another
+    version of it are not used
+    '''
+    return source_hash(optimize)
+
+
+def parser_hash():
+    '''
+    Returns the hash of the parser, statements parsed by another version of
+    it are parsed again while their source is there
+    '''
+    from core import parser
+    return source_hash(parser)
+
+
+def compiled_path(path):
+    '''
+    Returns the shipped .elpc of a source, next to it
+    '''
+    return os.path.splitext(str(path))[0] + ".elpc"
+
+
+def cache_folder():
+    return os.path.join(os.getcwd(), ".elang_cache", "elpc")
+
+
+def cached_path(path):
+    '''
+    Returns the .elpc a source is cached in, named after the file and its
+    full path so files of the same name in other folders don't collide
+    '''
+    path = os.path.splitext(os.path.abspath(str(path)))[0]
+    name = os.path.basename(path) + "-" + hashlib.sha256(path.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_folder(), name + ".elpc")
+
+
+def evict(config):
+    '''
+    Deletes the least recently used cached programs until they fit in
+    CacheSize
+    '''
+    try:
+        cache.evict(cache_folder(), int(config.get("CacheSize", 256)) * 1024 * 1024)
+    except OSError:
+        pass
+
+
+def pack(program):
+    if program == None:
+        return None
+    # Names repeat a lot, interned they are written only once
+    return tuple(
+        (INDEX[type(node)],) + tuple(
+            sys.intern(i) if isinstance(i, str) else i
+            for i in (getattr(node, j) for j in FIELDS[INDEX[type(node)]])
+        )
+        for node in program
+    )
+
+
+def unpack(nodes):
+    if nodes == None:
+        return None
+    return [NODES[node[0]](*node[1:]) for node in nodes]
+
+
+class Compiled():
+    '''
+    This is a class for a program loaded from or saved to a .elpc
+    '''
+    def __init__(self, path, digest, program, errors=(), optimizer=None, optimized=None, parser=None):
+        self.path = path
+        self.digest = digest
+        self.parser = parser or parser_hash()
+        self.program = program
+        self.errors = list(errors)
+        self.optimizer = optimizer
+        self.optimized = optimized
+        # Only a program that was parsed or optimized again is saved
+        self.changed = False
+
+    def dumps(self):
+        return HEADER + marshal.dumps((
+            VERSION, LAYOUT, self.digest, self.parser, tuple(self.errors),
+            pack(self.program), self.optimizer, pack(self.optimized)
+        ))
+
+    def optimize(self, config):
+        '''
+        Returns the program optimized for config, from the file if it was
+        optimized by this version of the optimizer before
+        '''
+        if not config.get("Optimize", True):
+            return self.program
+        if self.optimized == None or self.optimizer != optimizer_hash():
+            self.optimized = optimize.run(self.program, config)
+            self.optimizer = optimizer_hash()
+            self.changed = True
+        return self.optimized
+
+    def save(self):
+        '''
+        Writes the file when something changed, never failing the build
+        when it can't
+        '''
+        if not self.changed:
+            return
+        temp = "{}.{}.tmp".format(self.path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(self.path) or os.curdir, exist_ok=True)
+            with open(temp, "wb") as f:
+                f.write(self.dumps())
+            os.replace(temp, self.path)
+            self.changed = False
+        except OSError:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+
+
+def loads(data, path=None, digest=None):
+    '''
+    Returns the Compiled program of .elpc bytes, or None when they are not
+    a .elpc of this version or, given a digest, of that source
+    '''
+    if data[:len(HEADER)] != HEADER:
+        return None
+    try:
+        version, layout, saved, parsed, errors, nodes, hashed, optimized = marshal.loads(data[len(HEADER):])
+        if version != VERSION or layout != LAYOUT:
+            return None
+        # Only what can be parsed again has to come from this parser
+        if digest != None and (saved != digest or parsed != parser_hash()):
+            return None
+        return Compiled(path, saved, unpack(nodes), errors, hashed, unpack(optimized), parsed)
+    except (EOFError, ValueError, TypeError, IndexError, KeyError):
+        # Anything but a .elpc written by this version
+        return None
+
+
+def read(path, digest=None):
+    try:
+        with open(path, "rb") as f:
+            return loads(f.read(), path, digest)
+    except OSError:
+        return None
+
+
+class Hashing(io.RawIOBase):
+    '''
+    Reads a binary file, taking the sha256 of everything read on the way
+    '''
+    def __init__(self, f):
+        self.f = f
+        self.hash = hashlib.sha256()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = self.f.readinto(buffer)
+        if size:
+            self.hash.update(memoryview(buffer)[:size])
+        return size
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse(parser, path, target=None):
+    '''
+    Parses the source at path into a Compiled program, streaming its lines
+    into the parser while they are hashed. It is saved to target, its
+    cached .elpc by default.
+    '''
+    start = len(parser.errors)
+    with open(path, "rb") as f:
+        source = Hashing(f)
+        # Decoded the same way the reader opens the file
+        program = list(parser.parse(io.TextIOWrapper(io.BufferedReader(source))))
+    compiled = Compiled(target or cached_path(path), source.hash.hexdigest(), program, parser.errors[start:])
+    compiled.changed = True
+    return compiled
+
+
+def load(parser, file_name):
+    '''
+    Returns the Compiled program of file_name, a .elpp or a shipped .elpc,
+    parsing it with parser when the .elpc is missing or out of date. None
+    when there is nothing to load.
+    '''
+    name = str(file_name)
+    cached = cached_path(name)
+    if name.endswith(".elpp") and os.path.isfile(name):
+        compiled = read(cached, file_hash(name))
+        if compiled == None:
+            return parse(parser, name)
+    else:
+        # Only the parsed form was shipped
+        if not name.endswith(".elpc"):
+            name = compiled_path(name)
+        shipped = read(name)
+        if shipped == None:
+            parser.error("ERR: {} IS NOT A VALID .elpc FILE!".format(name))
+            return None
+        # What is found out about it, like its optimized statements, is
+        # cached and never written into the shipped file
+        compiled = read(cached)
+        if compiled == None or compiled.digest != shipped.digest or compiled.parser != shipped.parser:
+            compiled = shipped
+            compiled.path = cached
+
+    # Touching the entry marks it as recently used for eviction
+    try:
+        os.utime(cached, None)
+    except OSError:
+        pass
+
+    # Whatever was wrong with the code is still reported
+    for error in compiled.errors:
+        parser.error(error)
+    return compiled
+
+
+if __name__ == "__main__":
+    from core.parser import Parser
+    from core.misc import logger, helper
+
+    for path in sys.argv[1:]:
+        compiled = parse(Parser(logger.NullLog, helper.bcolors()), path, compiled_path(path))
+        compiled.save()
+        print("{} -> {} ({} STATEMENTS)".format(path, compiled.path, len(compiled.program)))
@@ -0,0 +1,62 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Output side of the languages. Generated code is written as fragments
+    straight into its targets, a file, a pipe to the compiler or memory,
+    so the size of a program never costs more than one pass over it.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import hashlib
+import io
+
+
+class Digest():
+    '''
+    A write only target that keeps the sha256 of everything written to it
+    '''
+    def __init__(self):
+        self.hash = hashlib.sha256()
+
+    def write(self, fragment):
+        self.hash.update(fragment.encode("utf-8"))
+
+    def hexdigest(self):
+        return self.hash.hexdigest()
+
+
+class Emitter():
+    '''
+    Writes fragments to every target given, or to memory when there is none.
+    Binary targets such as the stdin of a process get utf-8 encoded text.
+    '''
+    def __init__(self, *targets):
+        self.buffer = None
+        if not targets:
+            self.buffer = io.StringIO()
+            targets = (self.buffer,)
+
+        self.writers = []
+        for target in targets:
+            if isinstance(target, (io.RawIOBase, io.BufferedIOBase)):
+                self.writers.append(lambda fragment, target=target: target.write(fragment.encode("utf-8")))
+            else:
+                self.writers.append(target.write)
+
+    def write(self, fragment):
+        for writer in self.writers:
+            writer(fragment)
+
+    def writelines(self, fragments):
+        for fragment in fragments:
+            for writer in self.writers:
+                writer(fragment)
+
+    def getvalue(self):
+        '''
+        Returns the text written so far when writing to memory
+        '''
+        if self.buffer == None:
+            return None
+        return self.buffer.getvalue()
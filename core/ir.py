@@ -0,0 +1,177 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Intermediate representation of ELang programs. The parser turns every
+    line into one of these statements and the languages generate their code
+    from them. Blocks are flat: an If, Define, Foreach or Repeat is closed
+    by a later End.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+
+class Node():
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(repr(getattr(self, i)) for i in self.__slots__)
+        return "{}({})".format(type(self).__name__, fields)
+
+
+class Show(Node):
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+
+class Var(Node):
+    __slots__ = ("name", "value")
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+
+class Arithmetic(Node):
+    '''
+    Base of add, subtract, multiply and divide: left and right as written in
+    the source and the variable that receives the result
+    '''
+    __slots__ = ("left", "right", "target")
+
+    def __init__(self, left, right, target):
+        self.left = left
+        self.right = right
+        self.target = target
+
+
+class Add(Arithmetic):
+    __slots__ = ()
+
+
+class Sub(Arithmetic):
+    __slots__ = ()
+
+
+class Mul(Arithmetic):
+    __slots__ = ()
+
+
+class Div(Arithmetic):
+    __slots__ = ()
+
+
+class Take(Node):
+    __slots__ = ("type", "name")
+
+    def __init__(self, type, name):
+        self.type = type
+        self.name = name
+
+
+class Read(Node):
+    __slots__ = ("file", "target")
+
+    def __init__(self, file, target):
+        self.file = file
+        self.target = target
+
+
+class Write(Node):
+    __slots__ = ("var", "file")
+
+    def __init__(self, var, file):
+        self.var = var
+        self.file = file
+
+
+class Append(Node):
+    __slots__ = ("var", "file")
+
+    def __init__(self, var, file):
+        self.var = var
+        self.file = file
+
+
+class If(Node):
+    __slots__ = ("left", "op", "right")
+
+    def __init__(self, left, op, right):
+        self.left = left
+        self.op = op
+        self.right = right
+
+
+class End(Node):
+    __slots__ = ()
+
+
+class Define(Node):
+    __slots__ = ("name", "args")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+
+class Call(Node):
+    __slots__ = ("name", "args")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+
+class Change(Node):
+    __slots__ = ("name", "value")
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+
+class Native(Node):
+    __slots__ = ("code",)
+
+    def __init__(self, code):
+        self.code = code
+
+
+class Run(Node):
+    __slots__ = ("command",)
+
+    def __init__(self, command):
+        self.command = command
+
+
+class Foreach(Node):
+    '''
+    Runs the statements up to its End once for every line of file
+    '''
+    __slots__ = ("var", "file")
+
+    def __init__(self, var, file):
+        self.var = var
+        self.file = file
+
+
+class Include(Node):
+    '''
+    Stands for the statements of another file, put in its place when the
+    modules of a program are linked
+    '''
+    __slots__ = ("file",)
+
+    def __init__(self, file):
+        self.file = file
+
+
+class Repeat(Node):
+    '''
+    Runs the statements up to its End count times
+    '''
+    __slots__ = ("count",)
+
+    def __init__(self, count):
+        self.count = count
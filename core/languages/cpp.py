@@ -1,272 +1,165 @@
-from os import getcwd
-from os.path import isfile, join
-
-
-class ELang():
+from contextlib import nullcontext
+import io
+from core import ir, optimize
+from core.resolver import Resolver
+from core.emitter import Emitter, Digest
+from core.misc import profiles, cache
+from core.languages.cpp_runtime import FILES_HELPER, FLUSH_HELPER, READ_HELPER, WRITE_HELPER, APPEND_HELPER, HELPERS_INCLUDES, HEADER, HELPERS, Runtime
+import sys
+
+
+# Code closing each kind of block at its end
+BLOCK_ENDS = {
+    "if": '    }\n',
+    "define": '    };\n',
+    "foreach": '    }\n    }\n',
+    "repeat": '    }\n'
+}
+
+
+class ELang(Resolver):
     def __init__(self, config, logger, colors):
-        self.config = config
-        self.logger = logger()
-        self.colors = colors
-        self.filename = "compile.elpp"
+        Resolver.__init__(self, logger, colors)
+        # A core.misc.profiler.Profiler set here times every phase of compile()
+        self.profiler = None
+        # A core.misc.cache.BuildCache set here skips compiling split
+        # functions of a program it already has
+        self.build_cache = None
+        self.reset(config)
+
+    def reset(self, config=None):
+        '''
+        Forgets everything about the last program, so the object can
+        translate the next one
+        '''
+        Resolver.reset(self, config)
         self.data = []
-        self.comp_data = []
         self.commands = []
-        self.vars = {}
-        self.func_var = {}
         self.read_finalize = False
         self.write_finalize = False
         self.append_finalize = False
-        self.func = False
-        self.data_types = ["string", "int"]
-        self.features = [
-            "show",
-            "variable",
-            "add",
-            "subtract",
-            "multiply",
-            "divide",
-            "take",
-            "read",
-            "write",
-            "append",
-            "if",
-            "end",
-            "define",
-            "function",
-            "change",
-            "native",
-            "run"
-        ]
-
-    def reader(self, file_name=None):
+        self.foreach_finalize = False
+        self.files_written = False
+        self.digest = ""
+        self.runtime = None
+        # The code for the compiler's stdin, None when it was written to a .cpp
+        self.code = None
+        # Top level defines become free functions of their own translation
+        # unit, each is [name, args, commands]
+        self.split = self.config.get("SplitFunctions", False)
+        self.functions = []
+        self.main_commands = None
+        # Fast I/O buffers output and only flushes before input and at exit
+        self.fast_io = self.config.get("FastIO", True)
+        if self.fast_io:
+            self.endl = "'\\n'"
+        else:
+            self.endl = "endl"
+
+    def generate(self, program):
         '''
-        This function is for reading file of ELang code...
+        Generates the body of main() from a list of IR statements
         '''
-        self.logger.logNormal("Starting to read the file!\n")
-        print(self.colors.HEADER + "\n    [[ STARTING COMPILATION TO BINARY ]]    ")
-        print(self.colors.OKBLUE + "\nREADING MAIN CODE FILE...")
-        if file_name == None:
-            self.logger.logNormal("FileName Not Given By The Compiler!\n")
-            print("\nFILENAME HAS NOT BE GIVEN BY THE COMPILER!")
-            # If filename is empty
-            try:
-                print("\nTRYING TO READ THE DEFAULT CODE FILE")
-                PATH = str(join(getcwd(), self.filename))
-                if isfile(PATH):
-                    # If file_name does exist:
-                    with open(str(self.filename), "r") as f:
-                        # Read file line by line and save it to global variable data:
-                        self.data = f.readlines()
-                else:
-                    # If file_name does not exist:
-                    print("ERR: FILE {} DOES NOT EXIST!".format(str(self.filename)))
-            except FileNotFoundError:
-                print("ERR: FILE {} NOT FOUND!".format(str(self.filename)))
+        # Files are written through buffers that other programs and native
+        # code don't see until they are flushed
+        self.files_written = any(isinstance(node, (ir.Write, ir.Append)) for node in program)
+        self.resolve(program)
 
-        else:
-            # If filename is not empty
-            try:
-                # Reading the file extention
-                extention = str(file_name)[-4:]
-                if extention != "elpp":
-                    # If file extention is wrong:
-                    print("ERR: WRONG FILE EXTENTION FOR {}! \nMUST BE: .elpp".format(str(file_name)))
-                    exit()
-
-                PATH = str(join(getcwd(), str(file_name)))
-                if isfile(PATH):
-                    # If file_name does exist:
-                    with open(str(file_name), "r") as f:
-                        # Read file line by line and save it to golobal variable data:
-                        self.data = f.readlines()
-                    del file_name
-                    del extention
-                else:
-                    # If file_name does not exist:
-                    print("ERR: FILE {} DOES NOT EXIST!".format(str(file_name)))
-
-            except FileNotFoundError:
-                print("ERR: FILE {} NOT FOUND!".format(str(file_name)))
-    
-    def clean(self):
-        # let's make our first list to gather first datas
-        data = []
-        for i in self.data:
-            # This will replace any new line from every lines and append to data list
-            i = str(i).replace("\n", "")
-            data.append(i)
-        
-        # let's make second list to save second loop data
-        new_data = []
-        for i in data:
-            # and now let's delete any lines that is blank and append to new_data list
-            if i != "": new_data.append(i)
-        
-        # Let's change values of data by redefining it to contain new_data values
-        data = new_data
-        
-        # Save data to global data and delete useless variables        
-        self.data = data
-        del data
-        del new_data
-    
-    def indentify(self):
-        # Do a loop in data
-        for i in self.data:
-            # Split each to have clear view
-            o = i.split()
-            # Check if first word is a keyword!
-            if o[0].lower() in self.features:
-                # Deleting the keyword and putting them into a list
-                i = i.replace(str(str(o[0]) + " "), "")
-                data = [o[0].lower(), [i]]
-                # And appending it to commands
-                self.commands.append(data)
-    
-    def parse(self):
-        data = []
-        try:
-            for i in self.commands:
-                o = i[1][0].split()
-                if i[0] == self.features[0]:
-                    data.append(i)
-                elif i[0] == self.features[1]:
-                    var_data = str(i[1][0])
-                    data_word = str(o[0])
-                    equalt_word = str(o[1])
-                    var_data = var_data.replace(str(data_word + " "), "")
-                    var_data = var_data.replace(str(equalt_word) + " ", "")
-                    this_data = ["var", [o[0], var_data]]
-                    data.append(this_data) 
-                elif i[0] == self.features[2]:
-                    this_data = ["add", [o[0], o[2], o[4]]]
-                    data.append(this_data)
-                elif i[0] == self.features[3]:
-                    this_data = ["sub", [o[0], o[2], o[4]]]
-                    data.append(this_data)
-                elif i[0] == self.features[4]:
-                    this_data = ["mul", [o[0], o[2], o[4]]]
-                    data.append(this_data)
-                elif i[0] == self.features[5]:
-                    this_data = ["div", [o[0], o[2], o[4]]]
-                    data.append(this_data)
-                elif i[0] == self.features[6]:
-                    this_data = ["take", [o[0], o[1]]]
-                    data.append(this_data) 
-                elif i[0] == self.features[7]:
-                    this_data = ["read", [o[0], o[2]]]
-                    data.append(this_data)
-                elif i[0] == self.features[8]:
-                    this_data = ["write", [o[0], o[2]]]
-                    data.append(this_data)
-                elif i[0] == self.features[9]:
-                    this_data = ["append", [o[0], o[2]]]
-                    data.append(this_data)
-                elif i[0] == self.features[10]:
-                    this_data = ["if", [o[0], o[1], o[2]]]
-                    data.append(this_data)
-                elif i[0] == self.features[11]:
-                    data.append(["end"])
-                elif i[0] == self.features[12]:
-                    this_data = ["def", [o[0]], []]
-                    del o[0]
-                    del o[0]
-                    for p in o:
-                        this_data[2].append(p)
-                    data.append(this_data)
-                elif i[0] == self.features[13]:
-                    this_data = ["func", o[0], []]
-                    del o[0]
-                    for p in o:
-                        this_data[2].append(p)
-                    data.append(this_data)
-                elif i[0] == self.features[14]:
-                    this_data = ["change", [o[0], o[2]]]
-                    data.append(this_data)
-                elif i[0] == self.features[15]:
-                    data.append(i)
-                elif i[0] == self.features[16]:
-                    data.append(i)
-                    
-            self.data = data
-        except Exception as e:
-            print(e)
+    def phase(self, name):
+        '''
+        Times a phase when a profiler is set, the entry it gives can take
+        the number of statements the phase left behind
+        '''
+        if self.profiler == None:
+            return nullcontext({})
+        return self.profiler.phase(name)
+
+    def translate(self, lines):
+        '''
+        Translates lines of ELang code and returns the C++ code, nothing is
+        read, written or printed on the way
+        '''
+        self.reset()
+        self.data = optimize.run(list(self.parse(lines)), self.config)
+        self.generate(self.data)
+        return self.finalize()
 
     def compile(self):
+        self.reset()
         name = self.config["FileName"]
-        self.reader(name)
-        self.clean()
-        self.indentify()
-        self.parse()
-        self.commands = []
-        for i in self.data:
-            if i[0] == "show":
-                self.comp_data = i[1]
-                self.show()
-            elif i[0] == "var":
-                if self.func:
-                    self.func_var[i[1][0]] = i[1][1]
-                else:
-                    self.vars[i[1][0]] = i[1][1]
-                self.comp_data = [i[1][0], i[1][1]]
-                self.var()
-            elif i[0] == "add":
-                self.comp_data = [i[1][0], i[1][1], i[1][2]]
-                self.add()
-            elif i[0] == "sub":
-                self.comp_data = [i[1][0], i[1][1], i[1][2]]
-                self.sub()
-            elif i[0] == "mul":
-                self.comp_data = [i[1][0], i[1][1], i[1][2]]
-                self.mul()
-            elif i[0] == "div":
-                self.comp_data = [i[1][0], i[1][1], i[1][2]]
-                self.div()
-            elif i[0] == "take":
-                self.comp_data = [i[1][0], i[1][1]]
-                self.take()
-            elif i[0] == "read":
-                self.comp_data = [i[1][0], i[1][1]]
-                self.read()
-            elif i[0] == "write":
-                self.comp_data = [i[1][0], i[1][1]]
-                self.write()
-            elif i[0] == "append":
-                self.comp_data = [i[1][0], i[1][1]]
-                self.append()
-            elif i[0] == "if":
-                self.comp_data = [i[1][0], i[1][1], i[1][2]]
-                self.if_statement()
-            elif i[0] == "end":
-                self.comp_data = [i[0]]
-                self.end()
-            elif i[0] == "def":
-                self.comp_data = [i[1], i[2]]
-                self.define()
-            elif i[0] == "func":
-                self.comp_data = [i[1], i[2]]
-                self.function()
-            elif i[0] == "change":
-                self.comp_data = [i[1][0], i[1][1]]
-                self.change()
-            elif i[0] == "native":
-                self.comp_data = i[1]
-                self.native()
-            elif i[0] == "run":
-                self.comp_data = i[1]
-                self.run()
-
-        code = self.finalize()
-        comp = self.config["CompileOnly"]
-
-        print(code)
+        # Reading, parsing or loading the .elpc is one phase
+        with self.phase("parse") as entry:
+            program = self.load(name)
+            entry["statements"] = len(program)
+        with self.phase("optimize") as entry:
+            self.data = self.optimize(program)
+            entry["statements"] = len(self.data)
+        with self.phase("generate") as entry:
+            self.generate(self.data)
+            entry["statements"] = len(self.commands)
 
-        comp_name = str(name).replace(".elpp", "") + ".cpp"
-        with open(comp_name, "w") as f:
-            f.write(code)
+        comp = self.config["CompileOnly"]
 
-        compile_command = str(self.config["G++Path"] + " -o " + self.config["Name"] + " " + \
-             comp_name + " " + self.config["Flags"])
+        self.runtime = None
+        if self.config.get("Runtime", "inline") == "prebuilt":
+            with self.phase("runtime"):
+                runtime = Runtime(self.config)
+                if runtime.prepare():
+                    self.runtime = runtime
+                else:
+                    print(self.colors.WARNING + "\nCOULD NOT BUILD THE PREBUILT RUNTIME, IT WILL BE PASTED INTO THE CODE!")
+
+        # The code goes to its targets in one pass while its hash is taken
+        # for the build cache. Unless the .cpp is kept it stays in memory
+        # and is piped to the compiler.
+        digest = Digest()
+        targets = [digest]
+        echo = self.config.get("Echo", False)
+        if echo:
+            targets.append(sys.stdout)
+        comp_name = str(name).replace(".elpp", "").replace(".elpc", "") + ".cpp"
+        keep = self.config.get("KeepCpp", False)
+        with self.phase("finalize"):
+            if keep:
+                with open(comp_name, "w") as f:
+                    self.finalize(f, *targets)
+            else:
+                memory = io.StringIO()
+                self.finalize(memory, *targets)
+                self.code = memory.getvalue()
+        if echo:
+            print()
+        if self.runtime:
+            digest.write(self.runtime.key)
+        self.digest = digest.hexdigest()
+
+        # Arguments are kept apart so paths with spaces survive
+        compile_command = [self.config["G++Path"], "-o", self.config["Name"]]
+
+        # Split functions are compiled on their own and only linked here,
+        # pgo needs every unit instrumented so it builds the whole program
+        if self.functions and self.config.get("Profile") != "pgo" and not self.cached():
+            with self.phase("functions") as entry:
+                objects = self.build_units()
+                entry["statements"] = len(self.functions)
+            if objects != None:
+                self.code = None
+                compile_command += objects + profiles.flags(self.config)
+                if self.runtime:
+                    compile_command += self.runtime.link_arguments()
+                return [compile_command, comp == True]
+            print(self.colors.WARNING + "\nCOULD NOT COMPILE THE FUNCTIONS SEPARATELY, BUILDING THE WHOLE PROGRAM!")
+
+        if self.runtime:
+            compile_command += self.runtime.compile_arguments()
+        if keep:
+            compile_command.append(comp_name)
+        else:
+            # Whatever follows the code on stdin is known by its extension again
+            compile_command += ["-x", "c++", "-", "-x", "none"]
+        compile_command += profiles.flags(self.config)
+        if self.runtime:
+            compile_command += self.runtime.link_arguments()
 
         reply = [compile_command]
 
@@ -277,395 +170,273 @@ class ELang():
         
         return reply
 
-    def show(self):
-        if self.func:
-            if self.comp_data[0] not in self.func_var:
-                to_show = '    cout << "' + self.comp_data[0] + '" << endl;\n'
-
-            else:
-                to_show = '    cout << ' + self.comp_data[0] + ' << endl;\n'
-        
+    def emit_show(self, text, variable):
+        if variable:
+            to_show = '    cout << ' + text + ' << ' + self.endl + ';\n'
         else:
-            if self.comp_data[0] not in self.vars:
-                to_show = '    cout << "' + self.comp_data[0] + '" << endl;\n'
-
-            else:
-                to_show = '    cout << ' + self.comp_data[0] + ' << endl;\n'
+            to_show = '    cout << "' + text + '" << ' + self.endl + ';\n'
 
         self.commands.append(to_show)
-    
-    def var(self):
-        try:
-            data = int(self.comp_data[1])
-            type_of_data = "int"
-        except ValueError:
-            data = self.comp_data[1]
-            type_of_data = "string"
-
-        if type_of_data == "string":
-            to_show = '    ' + type_of_data + ' ' + self.comp_data[0] + ' = "' + data + '";\n'
+
+    def emit_var(self, name, data):
+        if isinstance(data, int):
+            to_show = '    int ' + name + ' = ' + str(data) + ';\n'
         else:
-            to_show = '    ' + type_of_data + ' ' + self.comp_data[0] + ' = ' + str(data) + ';\n'
+            to_show = '    string ' + name + ' = "' + data + '";\n'
 
         self.commands.append(to_show)
 
-    def add(self):
-        if self.comp_data[2] in self.vars:
-            data_on_var = True
-        else:
-            data_on_var = False
-
-        if self.comp_data[1] in self.vars:
-            comp_data1 = self.comp_data[1]
-        else:
-            comp_data1 = self.comp_data[1]
-        
-        if self.comp_data[0] in self.vars:
-            comp_data0 = self.comp_data[0]
+    def emit_calc(self, target, op, left, right, declare):
+        if declare:
+            to_show = '    auto ' + target
         else:
-            comp_data0 = self.comp_data[0]
-        
-        try:
-            data0 = int(comp_data0)
-            data1 = int(comp_data1)
-        except ValueError:
-            data0 = comp_data0
-            data1 = comp_data1
-
-        if data_on_var:
-            to_show = '    ' + self.comp_data[2] + ' = ' + str(data0) + ' + ' + str(data1) + ';\n'
+            to_show = '    ' + target
+        to_show += ' = ' + left + ' ' + op + ' ' + right
+        if op == "*":
+            to_show += ' ;\n'
         else:
-            to_show = '    auto ' + self.comp_data[2] + ' = ' + str(data0) + ' + ' + str(data1) + ';\n'
-
-            try:
-                self.vars[self.comp_data[2]] = data0 + data1
-            except ValueError:
-                self.vars[self.comp_data[2]] = str(data0) + str(data1)
+            to_show += ';\n'
 
         self.commands.append(to_show)
-    
-    def sub(self):
-        if self.comp_data[2] in self.vars:
-            data_on_var = True
-        else:
-            data_on_var = False
 
-        if self.comp_data[1] in self.vars:
-            comp_data1 = self.vars[self.comp_data[1]]
-        else:
-            comp_data1 = self.comp_data[1]
-        
-        if self.comp_data[0] in self.vars:
-            comp_data0 = self.vars[self.comp_data[0]]
-        else:
-            comp_data0 = self.comp_data[0]
-        
-        data0 = comp_data0
-        data1 = comp_data1
+    def emit_text(self, target, text, count, declare):
+        to_show = '    for(int i = 0; i < ' + str(count) + ' ; i++){ ' + target + ' += "' + text + '";}\n'
+        if declare:
+            # A string literal would be a const char* that can't be added to
+            to_show = '    string ' + target + ' = "";\n' + to_show
 
-        if data_on_var:
-            to_show = '    ' + self.comp_data[2] + ' = ' + str(data0) + ' - ' + str(data1) + ';\n'
-        else:
-            to_show = '    auto ' + self.comp_data[2] + ' = ' + str(data0) + ' - ' + str(data1) + ';\n'
-            
-            try:
-                self.vars[self.comp_data[2]] = data0 - data1
-            except ValueError:
-                self.vars[self.comp_data[2]] = str(data0) + str(data1)
-
-        print(to_show)
         self.commands.append(to_show)
 
-    def mul(self):
-        if self.comp_data[2] in self.vars:
-            data_on_var = True
-        else:
-            data_on_var = False
-
-        if self.comp_data[1] in self.vars:
-            comp_data1 = self.vars[self.comp_data[1]]
-        else:
-            comp_data1 = self.comp_data[1]
-        
-        if self.comp_data[0] in self.vars:
-            comp_data0 = self.vars[self.comp_data[0]]
+    def flush(self):
+        '''
+        Output is not tied to input in fast I/O mode, so prompts are flushed by hand
+        '''
+        if self.fast_io:
+            self.commands.append('    cout.flush();\n')
+
+    def emit_take(self, kind, name, existing):
+        self.flush()
+        if existing:
+            to_show = '    cin >> ' + name + ' ;\n'
+        elif kind == self.data_types[0]:
+            to_show = '    ' + kind + ' ' + name + ' ;\n    getline (cin, ' + name + ') ;\n'
         else:
-            comp_data0 = self.comp_data[0]
-        
-        try:
-            data0 = int(comp_data0)
-            data1 = int(comp_data1)
-            type_of_data = "int"
-
-        except ValueError:
-            data0 = comp_data0
-            data1 = comp_data1
-            type_of_data = "string"
-        
-        try:
-            type_int = True
-            data1 = int(data1)
-        except ValueError:
-            type_int = False
+            to_show = '    ' + kind + ' ' + name + ' ;\n    cin >> ' + name + ';\n'
 
-        else:
-            if type_of_data == "string":
-                if type_int:
-                    if data_on_var:
-                        to_show = '    for(int i = 0; i > ' + str(data1) + ' ; i++){ ' + self.comp_data[2] + ' += "' + str(data0) + '"};\n'
-                    else:
-                        to_show = '    auto ' + self.comp_data[2] + ' =  "";' + \
-                        '\n    for(int i = 0; i < ' + str(data1) + ' ; i++){ ' + self.comp_data[2] + ' += "' + str(data0) + '";}\n'
-                        try:
-                            self.vars[self.comp_data[2]] = data0 * data1
-                        except ValueError:
-                            self.vars[self.comp_data[2]] = str(data0) * str(data1)
-            else:
-                if data_on_var:
-                    to_show = '    ' + self.comp_data[2] + ' = ' + str(data0) + ' * ' + str(data1) + ' ;\n'
-                else:
-                    to_show = '    auto ' + self.comp_data[2] + ' = ' + str(data0) + ' * ' + str(data1) + ' ;\n'
-                    try:
-                        self.vars[self.comp_data[2]] = data0 * data1
-                    except ValueError:
-                        self.vars[self.comp_data[2]] = str(data0) * str(data1)
-
-            self.commands.append(to_show)
-    
-    def div(self):
-        if self.comp_data[2] in self.vars:
-            data_on_var = True
-        else:
-            data_on_var = False
+        self.commands.append(to_show)
 
-        if self.comp_data[1] in self.vars:
-            comp_data1 = self.vars[self.comp_data[1]]
-        else:
-            comp_data1 = self.comp_data[1]
-        
-        if self.comp_data[0] in self.vars:
-            comp_data0 = self.vars[self.comp_data[0]]
-        else:
-            comp_data0 = self.comp_data[0]
-
-        try:
-            data0 = int(comp_data0)
-            data1 = int(comp_data1)
-            type_of_data = "int"
-        except ValueError:
-            data0 = comp_data0
-            data1 = comp_data1
-            type_of_data = "string"
-
-        if data_on_var:
-            to_show = '    ' + self.comp_data[2] + ' = ' + str(data1) + ' / ' + str(data0) + ';\n'
-        else:
-            to_show = '    auto ' + self.comp_data[2] + ' = ' + str(data1) + ' / ' + str(data0) + ';\n'
-            try:
-                self.vars[self.comp_data[2]] = data0 / data1
-            except ValueError:
-                self.vars[self.comp_data[2]] = ""
+    def emit_read(self, target, file_name, declare):
+        self.read_finalize = True
 
-        self.commands.append(to_show)
-    
-    def take(self):
-        if self.comp_data[0] in self.vars:
-            to_show = '    cin >> ' + self.comp_data[1] + ' ;\n'
+        if declare:
+            to_show = '    string ' + target + ' = read( ' + file_name + ' );\n'
         else:
-            if self.comp_data[0] == self.data_types[0]:
-                to_show = '    ' + self.comp_data[0] + ' ' + self.comp_data[1] + ' ;\n    getline (cin, ' + self.comp_data[1] + ') ;\n'
-                self.vars[self.comp_data[1]] = ""
-            else:
-                to_show = '    ' + self.comp_data[0] + ' ' + self.comp_data[1] + ' ;\n    cin >> ' + self.comp_data[1] + ';\n'
-                self.vars[self.comp_data[1]] = ""
+            to_show = '    ' + target + ' = read( ' + file_name + ' );\n'
 
         self.commands.append(to_show)
-    
-    def read(self):
-        self.read_finalize = True
 
-        if self.comp_data[1] in self.vars:
-            in_var = True
-        else:
-            in_var = False
-        
-        if in_var:
-            to_show = '    ' + self.comp_data[1] + ' = read( ' + self.comp_data[0] + ' );'
+    def emit_write(self, file_name, data, mode):
+        if mode == "w":
+            self.write_finalize = True
+            helper = 'write'
         else:
-            to_show = '    string ' + self.comp_data[1] + ' = read( "' + self.comp_data[0] + '" );'
-            self.vars[self.comp_data[1]] = ""
+            self.append_finalize = True
+            helper = 'append'
 
+        to_show = '    ' + helper + '((char *)"' + file_name + '", (char *)"' + data + '");\n'
         self.commands.append(to_show)
-    
-    def write(self):
-        self.write_finalize = True
 
-        if self.comp_data[0] not in self.vars:
-            print("ERR: YOU NEED A VARIABLE TO WRITE DATA ON FILE! ERR ON {}, {}".format(self.comp_data[0], self.comp_data[1]))
-        else:
-            to_show = '    write((char *)"' + self.comp_data[1] + '", (char *)"' + self.vars[self.comp_data[0]] + '");\n'
-        
+    def emit_if(self, left, op, right):
+        to_show = '    if (' + left + ' ' + op + ' ' + right + "){\n"
+        self.blocks.append("if")
         self.commands.append(to_show)
-    
-    def append(self):
-        self.append_finalize = True
 
-        if self.comp_data[0] not in self.vars:
-            print("ERR: YOU NEED A VARIABLE TO APPEND DATA ON FILE! ERR ON {}, {}".format(self.comp_data[0], self.comp_data[1]))
+    def close(self, kind):
+        if kind == None:
+            self.commands.append('    }\n')
+        elif kind == "function":
+            # The body is done, main goes on where it stopped
+            self.commands = self.main_commands
         else:
-            to_show = '    append((char *)"' + self.comp_data[1] + '", (char *)"' + self.vars[self.comp_data[0]] + '");\n'
-        
+            self.commands.append(BLOCK_ENDS[kind])
+
+    def emit_define(self, node):
+        if self.split and not self.blocks:
+            self.blocks.append("function")
+            body = []
+            self.functions.append([node.name, node.args, body])
+            self.main_commands = self.commands
+            self.commands = body
+            return
+
+        self.blocks.append("define")
+        to_show = '    auto ' + node.name + ' = []('
+        to_show += ','.join(' string ' + i for i in node.args)
+        to_show += '){\n'
         self.commands.append(to_show)
-    
-    def if_statement(self):
-        if self.comp_data[0] not in self.vars:
-            data1 = False
-        else:
-            data1 = True
-        if self.comp_data[2] not in self.vars:
-            data2 = False
-        else:
-            data2 = True
-        
-        try:
-            self.comp_data[0] = int(self.comp_data[0])
-            data1_int = True
-        except ValueError:
-            data1_int = False
-            pass
-        
-        try:
-            self.comp_data[2] = int(self.comp_data[2])
-            data2_int = True
-        except ValueError:
-            data2_int = False
-            pass
-
-        if data1:
-            if data2:
-                to_show = '    if (' + str(self.comp_data[0]) + ' ' + self.comp_data[1] + ' ' + str(self.comp_data[2]) + "){\n"
-            else:
-                if data2_int:
-                    to_show = '    if (' + str(self.comp_data[0]) + ' ' + self.comp_data[1] + ' ' + str(self.comp_data[2]) + "){\n"
-                else:
-                    to_show = '    if (' + str(self.comp_data[0]) + ' ' + self.comp_data[1] + ' "' + str(self.comp_data[2]) + '"){\n'
-        else:
-            if data2:
-                if data1_int:
-                    to_show = '    if (' + str(self.comp_data[0]) + ' ' + self.comp_data[1] + ' ' + str(self.comp_data[2]) + "){\n"
-                else:
-                    to_show = '    if ("' + str(self.comp_data[0]) + '" ' + self.comp_data[1] + ' ' + str(self.comp_data[2]) + "){\n"
-            else:
-                if data1_int:
-                    if data2_int:
-                        to_show = '    if (' + str(self.comp_data[0]) + ' ' + self.comp_data[1] + ' ' + str(self.comp_data[2]) + "){\n"
-                    else:
-                        to_show = '    if (' + str(self.comp_data[0]) + ' ' + self.comp_data[1] + ' "' + str(self.comp_data[2]) + '"){\n'
-                else:
-                    if data2_int:
-                        to_show = '    if ("' + str(self.comp_data[0]) + '" ' + self.comp_data[1] + ' ' + str(self.comp_data[2]) + "){\n"
-                    else:
-                        to_show = '    if ("' + str(self.comp_data[0]) + '" ' + self.comp_data[1] + ' "' + str(self.comp_data[2]) + '"){\n'
 
+    def emit_call(self, node):
+        to_show = '    ' + node.name + '('
+        to_show += ','.join(' ' + i for i in node.args)
+        to_show += ');\n'
         self.commands.append(to_show)
-    
-    def end(self):
-        if self.func:
-            self.commands.append('    };\n')
-            self.func = False
-        else:
-            self.commands.append('    }\n')
-    
-    def define(self):
-        self.func = True
-        self.func_var = {}
 
-        for i in self.comp_data[1]:
-            self.func_var[i] = ""
-        
-        to_show = '    auto ' + self.comp_data[0][0] + ' = []('
-        for i in self.comp_data[1]:
-            to_show += ' string ' + i + ','
-        
-        to_show = to_show[:-1]
-        to_show += '){\n'
+    def emit_change(self, node):
+        to_show = "    " + node.name + ' = ' + node.value + ';\n'
+
         self.commands.append(to_show)
-    
-    def function(self):
-        to_show = '    ' + self.comp_data[0] + '('
-        for i in self.comp_data[1]:
-            to_show += ' ' + i + ','
-        to_show = to_show[:-1]
-        to_show += ');\n'
+
+    def flush_files(self):
+        if self.files_written:
+            self.commands.append('    fflush(NULL);\n')
+
+    def emit_native(self, node):
+        # Native code may print or read files on its own
+        self.flush()
+        self.flush_files()
+        self.commands.append('    ' + node.code + '\n')
+
+    def emit_run(self, node):
+        # The command writes to the same terminal, it has to come after our
+        # output, and may read files this program wrote
+        self.flush()
+        self.flush_files()
+        to_show = '    system("' + node.command + '");\n'
         self.commands.append(to_show)
-    
-    def change(self):
-        to_show = "    " + self.comp_data[0] + ' = ' + self.comp_data[1] + ';\n'
-        
+
+    def emit_foreach(self, var, file_name):
+        '''
+        Streams a file line by line through a buffered getline loop
+        '''
+        self.foreach_finalize = True
+        number = str(len(self.blocks))
+        stream = 'elang_in_' + number
+        buffer = 'elang_buffer_' + number
+
+        to_show = '    {\n' + \
+            '    flush_file(' + file_name + ');\n' + \
+            '    ifstream ' + stream + ';\n' + \
+            '    char ' + buffer + '[65536];\n' + \
+            '    ' + stream + '.rdbuf()->pubsetbuf(' + buffer + ', sizeof(' + buffer + '));\n' + \
+            '    ' + stream + '.open(' + file_name + ');\n' + \
+            '    string ' + var + ';\n' + \
+            '    while (getline(' + stream + ', ' + var + ')){\n'
+        self.blocks.append("foreach")
         self.commands.append(to_show)
-    
-    def native(self):
-        self.commands.append('    ' + self.comp_data[0] + '\n')
-    
-    def run(self):
-        to_show = '    system("' + self.comp_data[0] + '");\n'
+
+    def emit_repeat(self, count):
+        counter = 'elang_i_' + str(len(self.blocks))
+        to_show = '    for (long long ' + counter + ' = 0; ' + counter + ' < ' + count + '; ' + counter + '++){\n'
+        self.blocks.append("repeat")
         self.commands.append(to_show)
 
-    def finalize(self):
-        first_parts = '#include <iostream>'
-        
-        if self.read_finalize == True or self.write_finalize == True or self.append_finalize == True:
-            first_parts += "\n#include <fstream>\n#include <sstream>"
-
-        namespace = "\nusing namespace std;\n"
-
-        if self.read_finalize:
-            namespace += """\nstring read(string filename){
-
-    std::ifstream inFile;
-    inFile.open(filename); //open the input file
-
-    std::stringstream strStream;
-    strStream << inFile.rdbuf(); //read the file
-    std::string str = strStream.str(); //str holds the content of the file
-
-    inFile.close();
-    return str;
-
-}"""
-        if self.write_finalize:
-            namespace += """\nint write(char filename[], char to_write[]){
-    FILE *fptr;
-    fptr = fopen(filename,"w");
-    if(fptr == NULL)
-    {
-        printf("Error!");   
-        exit(1);             
-    }
-    fprintf(fptr,"%s",to_write);
-    fclose(fptr);
-    return 0;
-}"""
-        
-        if self.append_finalize:
-            namespace += """\nint append(char filename[], char to_write[]){
-    FILE *fptr;
-    fptr = fopen(filename,"ab");
-    if(fptr == NULL)
-    {
-        printf("Error!");
-        exit(1);
-    }
-    fprintf(fptr,"%s",to_write);
-    fclose(fptr);
-    return 0;
-}"""
-
-        namespace += "\nint main(){\n\n"
-        first_parts += namespace
-
-        for i in self.commands:
-            first_parts += str(i)
-        first_parts += '\n    return 0;'
-        first_parts += "\n}"
-        return first_parts
+    def signature(self, name, args):
+        return 'void ' + name + '(' + ','.join(' string ' + i for i in args) + ')'
+
+    def declarations(self, out):
+        for name, args, body in self.functions:
+            out.write('\n' + self.signature(name, args) + ';')
+        out.write('\n')
+
+    def definition(self, out, function):
+        name, args, body = function
+        out.write('\n' + self.signature(name, args) + '{\n')
+        out.writelines(body)
+        out.write('}\n')
+
+    def main(self, out):
+        out.write("\nint main(){\n\n")
+        if self.fast_io:
+            out.write("    ios_base::sync_with_stdio(false);\n    cin.tie(0);\n")
+        out.writelines(self.commands)
+        out.write('\n    return 0;')
+        out.write("\n}")
+
+    def finalize(self, *targets):
+        '''
+        Writes the whole translation unit to the targets, or returns it as
+        text when no target is given
+        '''
+        out = Emitter(*targets)
+
+        if self.runtime:
+            # Everything comes from the prebuilt runtime and its precompiled header
+            out.write('#include "elang_runtime.hpp"\n')
+        else:
+            out.write('#include <iostream>')
+
+            files = self.read_finalize or self.write_finalize or self.append_finalize or self.foreach_finalize
+            if files:
+                out.write(HELPERS_INCLUDES)
+
+            out.write("\nusing namespace std;\n")
+
+            if files:
+                out.write(FILES_HELPER)
+            if self.foreach_finalize:
+                out.write(FLUSH_HELPER)
+            if self.read_finalize:
+                out.write(READ_HELPER)
+            if self.write_finalize:
+                out.write(WRITE_HELPER)
+            if self.append_finalize:
+                out.write(APPEND_HELPER)
+
+        if self.functions:
+            self.declarations(out)
+            for function in self.functions:
+                self.definition(out, function)
+
+        self.main(out)
+        return out.getvalue()
+
+    def cached(self):
+        '''
+        Returns True when the build cache already has the binary of the
+        program just finalized
+        '''
+        return self.build_cache != None and self.build_cache.has(self.build_cache.key(self.digest))
+
+    def units(self):
+        '''
+        Returns the code of every translation unit of split mode: one per
+        function, one for main and one for the runtime unless it is prebuilt.
+        Each starts with the runtime header and declares every function.
+        '''
+        if self.runtime:
+            prelude = '#include "elang_runtime.hpp"\n'
+        else:
+            prelude = HEADER
+
+        reply = []
+        for function in self.functions:
+            out = Emitter()
+            out.write(prelude)
+            self.declarations(out)
+            self.definition(out, function)
+            reply.append(out.getvalue())
+
+        out = Emitter()
+        out.write(prelude)
+        self.declarations(out)
+        self.main(out)
+        reply.append(out.getvalue())
+
+        if not self.runtime:
+            reply.append(HEADER + HELPERS)
+        return reply
+
+    def build_units(self):
+        '''
+        Compiles every translation unit of split mode, only those that
+        changed since they were last compiled. Returns the object files, or
+        None when a unit did not compile.
+        '''
+        arguments = profiles.flags(self.config)
+        if self.runtime:
+            arguments = self.runtime.compile_arguments() + arguments
+
+        objects, failed = cache.ObjectCache(self.config).build(self.units(), arguments)
+        for result in failed:
+            self.logger.logError(result.stderr, "COULD NOT COMPILE A FUNCTION!")
+        return objects
@@ -0,0 +1,207 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Runtime of the C++ language. The read, write and append helpers keep
+    their files open for the whole run and read files in one go. They are
+    either pasted into every program or built once per compiler and flags
+    into a static library, with a precompiled header for the standard
+    includes that generated programs link against.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+from core.misc import cache, profiles
+from core.misc.runner import Runner
+
+
+FILES_HELPER = """
+struct ELangFiles {
+    // Open files by name, kept for the whole run and closed at exit
+    map<string, FILE *> handles;
+
+    FILE *get(const string &filename, const char *mode, bool fresh){
+        map<string, FILE *>::iterator found = handles.find(filename);
+        if(found != handles.end()){
+            if(!fresh) return found->second;
+            fclose(found->second);
+            handles.erase(found);
+        }
+        FILE *fptr = fopen(filename.c_str(), mode);
+        if(fptr == NULL)
+        {
+            printf("Error!");
+            exit(1);
+        }
+        setvbuf(fptr, NULL, _IOFBF, 1 << 16);
+        handles[filename] = fptr;
+        return fptr;
+    }
+
+    void flush(const string &filename){
+        map<string, FILE *>::iterator found = handles.find(filename);
+        if(found != handles.end()) fflush(found->second);
+    }
+
+    ~ELangFiles(){
+        for(map<string, FILE *>::iterator i = handles.begin(); i != handles.end(); ++i){
+            fclose(i->second);
+        }
+    }
+};
+
+static ELangFiles elang_files;
+"""
+
+FLUSH_HELPER = """\nvoid flush_file(string filename){
+    elang_files.flush(filename);
+}"""
+
+READ_HELPER = """\nstring read(string filename){
+    // Anything still buffered for this file has to be on disk first
+    elang_files.flush(filename);
+
+    string str;
+    FILE *fptr = fopen(filename.c_str(), "rb");
+    if(fptr == NULL) return str;
+
+    // One read straight into a string of the right size
+    if(fseek(fptr, 0, SEEK_END) == 0){
+        long size = ftell(fptr);
+        if(size > 0){
+            str.resize(size);
+            rewind(fptr);
+            str.resize(fread(&str[0], 1, size, fptr));
+            fclose(fptr);
+            return str;
+        }
+        rewind(fptr);
+    }
+
+    // Files that don't know their size are read in chunks
+    char buffer[65536];
+    size_t got;
+    while((got = fread(buffer, 1, sizeof(buffer), fptr)) > 0) str.append(buffer, got);
+    fclose(fptr);
+    return str;
+}"""
+
+WRITE_HELPER = """\nint write(char filename[], char to_write[]){
+    // Writing starts the file over, so it gets a new handle
+    FILE *fptr = elang_files.get(filename, "w", true);
+    fputs(to_write, fptr);
+    return 0;
+}"""
+
+APPEND_HELPER = """\nint append(char filename[], char to_write[]){
+    FILE *fptr = elang_files.get(filename, "ab", false);
+    fputs(to_write, fptr);
+    return 0;
+}"""
+
+HELPERS_INCLUDES = "\n#include <fstream>\n#include <cstdio>\n#include <cstdlib>\n#include <map>\n#include <string>"
+
+
+HEADER = """#ifndef ELANG_RUNTIME_HPP
+#define ELANG_RUNTIME_HPP
+#include <iostream>
+#include <fstream>
+#include <sstream>
+#include <string>
+#include <cstdio>
+#include <cstdlib>
+#include <map>
+using namespace std;
+
+void flush_file(string filename);
+string read(string filename);
+int write(char filename[], char to_write[]);
+int append(char filename[], char to_write[]);
+#endif
+"""
+
+HELPERS = FILES_HELPER + FLUSH_HELPER + READ_HELPER + WRITE_HELPER + APPEND_HELPER + "\n"
+
+SOURCE = '#include "elang_runtime.hpp"\n' + HELPERS
+
+
+class Runtime():
+    '''
+    This is a class for the prebuilt runtime of one compiler and flags
+    '''
+    def __init__(self, config, runner=None, path=None):
+        self.config = config
+        self.runner = runner or Runner(config.get("Timeout"))
+        self.flags = profiles.flags(config)
+
+        digest = hashlib.sha256()
+        digest.update(HEADER.encode("utf-8"))
+        digest.update(SOURCE.encode("utf-8"))
+        digest.update(b"\0" + str(config["G++Path"]).encode("utf-8"))
+        digest.update(b"\0" + " ".join(self.flags).encode("utf-8"))
+        digest.update(b"\0" + cache.compiler_version(config["G++Path"]))
+        self.key = digest.hexdigest()
+
+        if path == None:
+            path = os.path.join(os.getcwd(), ".elang_cache")
+        self.path = os.path.join(path, "runtime", self.key)
+        self.library = os.path.join(self.path, "libelang_runtime.a")
+
+    def archiver(self):
+        '''
+        Returns ar from the directory of the configured g++, if it has one
+        '''
+        folder = os.path.dirname(str(self.config["G++Path"]))
+        if folder:
+            return os.path.join(folder, "ar")
+        return "ar"
+
+    def prepare(self):
+        '''
+        Builds the runtime unless it was already built, returns False when
+        it could not be built
+        '''
+        if os.path.isfile(self.library):
+            return True
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Built aside and renamed into place, so parallel builds never see
+        # a half built runtime
+        temp = tempfile.mkdtemp(dir=os.path.dirname(self.path))
+        try:
+            header = os.path.join(temp, "elang_runtime.hpp")
+            source = os.path.join(temp, "elang_runtime.cpp")
+            obj = os.path.join(temp, "elang_runtime.o")
+            with open(header, "w") as f:
+                f.write(HEADER)
+            with open(source, "w") as f:
+                f.write(SOURCE)
+
+            gpp = self.config["G++Path"]
+            steps = [
+                [gpp, "-c", source, "-o", obj] + self.flags,
+                [self.archiver(), "rcs", os.path.join(temp, "libelang_runtime.a"), obj],
+                [gpp, "-x", "c++-header", header, "-o", header + ".gch"] + self.flags
+            ]
+            for step in steps:
+                if not self.runner.run(step).ok:
+                    return False
+
+            try:
+                os.rename(temp, self.path)
+            except OSError:
+                # Another build got there first
+                pass
+            return os.path.isfile(self.library)
+        finally:
+            shutil.rmtree(temp, ignore_errors=True)
+
+    def compile_arguments(self):
+        return ["-I", self.path]
+
+    def link_arguments(self):
+        return [self.library]
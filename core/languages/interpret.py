@@ -0,0 +1,463 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Interpreter of ELang. Programs run straight from their statements with
+    no compiler involved, behaving like the code core/languages/cpp.py
+    generates. Statements are first resolved in program order by the same
+    core.resolver as the C++ generator, then run. Blocks run in scopes of
+    their own like C++ blocks. Native C++ can't be run and is reported as
+    unsupported.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import subprocess
+import sys
+
+from core.resolver import Resolver
+
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+# Statements that open a block closed by a later end
+BLOCKS = ("if", "define", "foreach", "loop")
+
+
+class Stop(Exception):
+    '''
+    Raised when the program can't go on, like a C++ program that would not
+    compile or would crash there
+    '''
+
+
+def wrap(value):
+    # Numbers are C++ ints, which wrap around
+    if isinstance(value, int) and not INT_MIN <= value <= INT_MAX:
+        return (value - INT_MIN) % 2 ** 32 + INT_MIN
+    return value
+
+
+class Input():
+    '''
+    Standard input read the way cin reads it: by words for >> and by lines
+    for getline, sharing one buffer
+    '''
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = ""
+        self.position = 0
+
+    def more(self):
+        line = self.stream.readline()
+        if not line:
+            return False
+        self.buffer = self.buffer[self.position:] + line
+        self.position = 0
+        return True
+
+    def word(self):
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position].isspace():
+                self.position += 1
+            if self.position < len(self.buffer) or not self.more():
+                break
+        start = self.position
+        while True:
+            while self.position < len(self.buffer) and not self.buffer[self.position].isspace():
+                self.position += 1
+            if self.position < len(self.buffer) or not self.more():
+                break
+        return self.buffer[start:self.position]
+
+    def line(self):
+        while "\n" not in self.buffer[self.position:]:
+            if not self.more():
+                break
+        end = self.buffer.find("\n", self.position)
+        if end == -1:
+            reply = self.buffer[self.position:]
+            self.position = len(self.buffer)
+            return reply
+        reply = self.buffer[self.position:end]
+        self.position = end + 1
+        return reply
+
+
+class Scope():
+    '''
+    Variables of a block. Names it did not declare are looked up in the
+    blocks around it and assigned there.
+    '''
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.names = {}
+
+    def find(self, name):
+        scope = self
+        while scope != None:
+            if name in scope.names:
+                return scope
+            scope = scope.parent
+        return None
+
+    def __contains__(self, name):
+        return self.find(name) != None
+
+    def __getitem__(self, name):
+        scope = self.find(name)
+        if scope == None:
+            raise Stop("{} IS NOT A VARIABLE".format(name))
+        return scope.names[name]
+
+    def __setitem__(self, name, value):
+        scope = self.find(name)
+        if scope == None:
+            raise Stop("{} IS NOT A VARIABLE".format(name))
+        scope.names[name] = value
+
+    def get(self, name, default=None):
+        scope = self.find(name)
+        if scope == None:
+            return default
+        return scope.names[name]
+
+    def declare(self, name, value):
+        self.names[name] = value
+
+
+def number(text):
+    '''
+    Reads a number the way cin >> int does, 0 when there is none
+    '''
+    digits = ""
+    for i, char in enumerate(text):
+        if char.isdigit() or (i == 0 and char in "+-"):
+            digits += char
+        else:
+            break
+    try:
+        return wrap(int(digits))
+    except ValueError:
+        return 0
+
+
+class ELang(Resolver):
+    def __init__(self, config, logger, colors, stdin=None, stdout=None):
+        Resolver.__init__(self, logger, colors)
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+        self.reset(config)
+        # Resolved statement to runner table, blocks are run by execute()
+        self.runners = {
+            "show": self.run_show,
+            "var": self.run_var,
+            "calc": self.run_calc,
+            "text": self.run_text,
+            "take": self.run_take,
+            "read": self.run_read,
+            "write": self.run_write,
+            "end": self.run_end,
+            "call": self.run_call,
+            "change": self.run_change,
+            "system": self.run_system
+        }
+
+    def reset(self, config=None):
+        '''
+        Forgets everything about the last program, so the object can run
+        the next one
+        '''
+        Resolver.reset(self, config)
+        # Resolved statements, the index of the end of every block and the
+        # statements that opened the blocks still open
+        self.commands = []
+        self.ends = {}
+        self.opened = []
+        self.unsupported = False
+        # Functions defined so far while running
+        self.defined = {}
+        self.input = Input(self.stdin)
+
+    def interpret(self, lines=None):
+        '''
+        Runs lines of ELang code, or the configured file, and returns the
+        exit status of the program
+        '''
+        self.reset()
+        if lines == None:
+            program = self.load(self.config["FileName"])
+        else:
+            program = list(self.parse(lines))
+        # Built programs are optimized first, which decides what the
+        # generator knows about variables, so the same is done here
+        self.resolve(self.optimize(program))
+
+        if self.unsupported:
+            return 1
+
+        if not self.quiet:
+            print(self.colors.HEADER + "\n    [[ RUNNING THE PROGRAM ]]    " + self.colors.ENDC)
+        try:
+            self.execute(0, len(self.commands), Scope())
+        except Stop as e:
+            self.stdout.flush()
+            self.error("ERR: {}".format(e))
+            return 1
+        self.stdout.flush()
+        return 0
+
+    def emit(self, *command):
+        self.commands.append(command)
+
+    def block(self, kind, *command):
+        self.blocks.append(kind)
+        self.opened.append(len(self.commands))
+        self.emit(*command)
+
+    # Resolved statements, in program order like the C++ generator
+
+    def emit_show(self, text, variable):
+        self.emit("show", text, variable)
+
+    def emit_var(self, name, data):
+        self.emit("var", name, data)
+
+    def emit_calc(self, target, op, left, right, declare):
+        self.emit("calc", target, op, left, right, declare)
+
+    def emit_text(self, target, text, count, declare):
+        self.emit("text", target, text, count, declare)
+
+    def emit_take(self, kind, name, existing):
+        self.emit("take", kind, name, existing)
+
+    def emit_read(self, target, file_name, declare):
+        self.emit("read", target, file_name, declare)
+
+    def emit_write(self, file_name, data, mode):
+        self.emit("write", file_name, data, mode)
+
+    def emit_if(self, left, op, right):
+        self.block("if", "if", left, op, right)
+
+    def close(self, kind):
+        if kind != None:
+            self.ends[self.opened.pop()] = len(self.commands)
+        self.emit("end")
+
+    def emit_define(self, node):
+        self.block("define", "define", node.name, node.args)
+
+    def emit_call(self, node):
+        self.emit("call", node.name, node.args)
+
+    def emit_change(self, node):
+        self.emit("change", node.name, node.value)
+
+    def emit_native(self, node):
+        self.unsupported = True
+        self.error("ERR: NATIVE IS NOT SUPPORTED BY THE INTERPRETER! ERR ON {}".format(node.code))
+
+    def emit_run(self, node):
+        self.emit("system", node.command)
+
+    def emit_foreach(self, var, file_name):
+        self.block("foreach", "foreach", var, file_name)
+
+    def emit_repeat(self, count):
+        self.block("repeat", "loop", count)
+
+    # Running
+
+    def value(self, token, scope):
+        '''
+        Returns the value of a C++ operand: a string literal, a number or a
+        variable
+        '''
+        if len(token) >= 2 and token[0] == '"' and token[-1] == '"':
+            return token[1:-1]
+        try:
+            return wrap(int(token))
+        except ValueError:
+            pass
+        if token in scope:
+            return scope[token]
+        raise Stop("{} IS NOT A VARIABLE".format(token))
+
+    def execute(self, start, end, scope):
+        '''
+        Runs the resolved statements from start up to end in scope
+        '''
+        index = start
+        while index < end:
+            command = self.commands[index]
+            kind = command[0]
+            if kind not in BLOCKS:
+                self.runners[kind](command, scope)
+                index += 1
+                continue
+
+            # A block without an end runs to the end of the program
+            close = self.ends.get(index, len(self.commands))
+            # Every run of a block body gets a scope of its own
+            if kind == "if":
+                if self.compare(command, scope):
+                    self.execute(index + 1, close, Scope(scope))
+            elif kind == "define":
+                self.defined[command[1]] = (command[2], index + 1, close)
+            elif kind == "foreach":
+                self.run_foreach(command, index + 1, close, scope)
+            else:
+                counter = 0
+                while counter < self.count(command[1], scope):
+                    self.execute(index + 1, close, Scope(scope))
+                    counter += 1
+            index = close + 1
+
+    def count(self, token, scope):
+        count = self.value(token, scope)
+        if not isinstance(count, int):
+            raise Stop("REPEAT NEEDS A NUMBER, {} IS NOT ONE".format(token))
+        return count
+
+    def compare(self, command, scope):
+        left = self.value(command[1], scope)
+        right = self.value(command[3], scope)
+        try:
+            return {
+                "==": lambda: left == right,
+                "!=": lambda: left != right,
+                "<": lambda: left < right,
+                ">": lambda: left > right,
+                "<=": lambda: left <= right,
+                ">=": lambda: left >= right
+            }[command[2]]()
+        except (KeyError, TypeError):
+            raise Stop("CAN'T COMPARE {} {} {}".format(command[1], command[2], command[3]))
+
+    def store(self, scope, name, value, declare):
+        if declare:
+            scope.declare(name, value)
+        else:
+            scope[name] = value
+
+    def run_show(self, command, scope):
+        if command[2]:
+            self.stdout.write(str(scope[command[1]]) + "\n")
+        else:
+            self.stdout.write(command[1] + "\n")
+
+    def run_var(self, command, scope):
+        scope.declare(command[1], command[2])
+
+    def run_calc(self, command, scope):
+        name, op, left, right, declare = command[1:]
+        right = self.value(right, scope)
+        # An empty left operand leaves a sign in front of the right one
+        if left == "" and op in "+-" and isinstance(right, int):
+            self.store(scope, name, wrap(-right if op == "-" else right), declare)
+            return
+        left = self.value(left, scope)
+
+        if isinstance(left, int) != isinstance(right, int) or (isinstance(left, str) and op != "+"):
+            raise Stop("CAN'T CALCULATE {} {} {}".format(command[3], op, command[4]))
+        if op == "+":
+            result = left + right
+        elif op == "-":
+            result = left - right
+        elif op == "*":
+            result = left * right
+        else:
+            if right == 0:
+                raise Stop("DIVISION BY ZERO IN {}".format(name))
+            # C++ division truncates toward zero
+            result = abs(left) // abs(right)
+            if (left < 0) != (right < 0):
+                result = -result
+        self.store(scope, name, wrap(result), declare)
+
+    def run_text(self, command, scope):
+        name, text, count, declare = command[1:]
+        if declare:
+            scope.declare(name, text * count)
+        else:
+            scope[name] = str(scope[name]) + text * count
+
+    def run_take(self, command, scope):
+        kind, name, existing = command[1:]
+        self.stdout.flush()
+        if existing:
+            if isinstance(scope[name], int):
+                scope[name] = number(self.input.word())
+            else:
+                scope[name] = self.input.word()
+        elif kind == self.data_types[0]:
+            scope.declare(name, self.input.line())
+        elif kind == self.data_types[1]:
+            scope.declare(name, number(self.input.word()))
+        else:
+            scope.declare(name, self.input.word())
+
+    def run_read(self, command, scope):
+        name, file_name, declare = command[1:]
+        try:
+            with open(str(self.value(file_name, scope)), "r", newline="") as f:
+                data = f.read()
+        except OSError:
+            data = ""
+        self.store(scope, name, data, declare)
+
+    def run_write(self, command, scope):
+        try:
+            with open(command[1], command[3]) as f:
+                f.write(command[2])
+        except OSError:
+            self.stdout.write("Error!")
+            raise Stop("CAN'T OPEN {}".format(command[1]))
+
+    def run_end(self, command, scope):
+        pass
+
+    def run_call(self, command, scope):
+        name, args = command[1:]
+        if name not in self.defined:
+            raise Stop("FUNCTION {} IS NOT DEFINED".format(name))
+        names, start, end = self.defined[name]
+        if len(names) != len(args):
+            raise Stop("FUNCTION {} TAKES {} ARGUMENTS".format(name, len(names)))
+
+        values = [self.value(i, scope) for i in args]
+        for i, value in zip(args, values):
+            if not isinstance(value, str):
+                raise Stop("ARGUMENT {} OF {} IS NOT A STRING".format(i, name))
+        # Functions only see their own arguments and variables
+        arguments = Scope()
+        for i, value in zip(names, values):
+            arguments.declare(i, value)
+        self.execute(start, end, arguments)
+
+    def run_change(self, command, scope):
+        scope[command[1]] = self.value(command[2], scope)
+
+    def run_system(self, command, scope):
+        self.stdout.flush()
+        if self.stdout is sys.stdout:
+            subprocess.call(command[1], shell=True)
+        else:
+            # Output going elsewhere than the terminal is collected for it
+            reply = subprocess.run(command[1], shell=True, stdout=subprocess.PIPE, universal_newlines=True)
+            self.stdout.write(reply.stdout)
+
+    def run_foreach(self, command, start, end, scope):
+        try:
+            f = open(str(self.value(command[2], scope)), "r", newline="")
+        except OSError:
+            return
+        # The line is a variable of the loop, around the scope of the body
+        loop = Scope(scope)
+        with f:
+            for line in f:
+                if line.endswith("\n"):
+                    line = line[:-1]
+                loop.declare(command[1], line)
+                self.execute(start, end, Scope(loop))
@@ -9,9 +9,15 @@
 
 from platform import system
 import os
+import sys
 
 def clearScreen():
+    # Nothing to clear when the output goes to a file or a pipe
+    if not sys.stdout.isatty() or os.environ.get('ELANG_NO_CLEAR'):
+        return
     if system() == 'Windows':
         os.system('cls')
     else:
-        os.system('clear')
\ No newline at end of file
+        # The escape codes clear just like clear does, without a process
+        sys.stdout.write('\033[H\033[2J\033[3J')
+        sys.stdout.flush()
\ No newline at end of file
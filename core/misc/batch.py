@@ -0,0 +1,164 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Batch compilation of many ELang programs. Every program is translated
+    in a pool of processes and the g++ jobs run side by side, so one run
+    of ELang can keep every core busy.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stdout
+import json
+import os
+import time
+
+from core.languages import cpp
+from core.misc import helper, logger, cache, profiles, runner
+
+
+def collect(paths):
+    '''
+    Expands directories in paths to the .elpp files inside them
+    '''
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".elpp"):
+                    files.append(os.path.join(path, name))
+        else:
+            files.append(path)
+    return files
+
+
+def problem(path):
+    '''
+    Returns why path can't be built, or None
+    '''
+    if not path.endswith(".elpp"):
+        return "ERR: WRONG FILE EXTENTION FOR {}! MUST BE: .elpp".format(path)
+    if not os.path.isfile(path):
+        return "ERR: FILE {} DOES NOT EXIST!".format(path)
+    return None
+
+
+def program_config(config, path):
+    '''
+    Returns a copy of config that builds path to a binary next to it
+    '''
+    config = dict(config)
+    config["FileName"] = path
+    config["Name"] = os.path.splitext(path)[0]
+    return config
+
+
+def translate(config):
+    '''
+    Translates one program, this runs inside the process pool
+    '''
+    start = time.time()
+    logger.configure(config.get("LogLevel"))
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        ELangObject = cpp.ELang(config, logger.Log, helper.bcolors())
+        ELangObject.build_cache = cache.BuildCache(config)
+        compileCode = ELangObject.compile()
+    return compileCode[0], ELangObject.digest, ELangObject.code, ELangObject.errors, time.time() - start
+
+
+class Batch():
+    '''
+    This is a class for building a list of ELang programs at once
+    '''
+    def __init__(self, config, jobs=None):
+        self.config = config
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache = cache.BuildCache(config)
+        self.runner = runner.Runner(config.get("Timeout"), self.jobs)
+
+    def build(self, path, command, digest, code=None):
+        '''
+        Runs g++ for one translated program, or restores it from the cache
+        '''
+        start = time.time()
+        key = self.cache.key(digest)
+        binary = cache.binary_path(os.path.splitext(path)[0])
+        if self.cache.restore(key, binary):
+            return "cached", "", time.time() - start
+
+        if self.config.get("Profile") == "pgo":
+            result = profiles.pgo_build(self.runner, command, self.config, binary, input=code)
+        else:
+            result = self.runner.run(command, input=code)
+        if not result.ok:
+            if result.timed_out:
+                return "timeout", result.stderr, time.time() - start
+            return "failed", result.stdout + result.stderr, time.time() - start
+
+        self.cache.store(key, binary)
+        return "ok", "", time.time() - start
+
+    def run(self, paths):
+        '''
+        Builds every program in paths and returns one result per program
+        '''
+        files = collect(paths)
+        results = []
+
+        # Translators log through this process, which alone writes the log
+        translators = ProcessPoolExecutor(self.jobs, initializer=logger.join, initargs=(logger.share(), logger.settings["level"]))
+        with translators, ThreadPoolExecutor(self.jobs) as compilers:
+            translating = []
+            for path in files:
+                result = {"file": path, "status": "failed", "translate": 0.0, "compile": 0.0, "output": problem(path) or ""}
+                results.append(result)
+                # Files that can't be read are failed without translating them
+                if not result["output"]:
+                    translating.append((result, translators.submit(translate, program_config(self.config, path))))
+
+            building = []
+            for result, future in translating:
+                path = result["file"]
+                try:
+                    command, digest, code, errors, result["translate"] = future.result()
+                except Exception as e:
+                    result["output"] = str(e)
+                    continue
+                if errors:
+                    # A program with errors would build, but not into what was written
+                    result["output"] = "\n".join(errors)
+                    continue
+                building.append((result, compilers.submit(self.build, path, command, digest, code)))
+
+            for result, future in building:
+                try:
+                    result["status"], result["output"], result["compile"] = future.result()
+                except Exception as e:
+                    result["output"] = str(e)
+
+        return results
+
+    def report(self, results, path=None):
+        '''
+        Prints a line per program and writes the results as JSON to path
+        '''
+        print(helper.bcolors.HEADER + "\n    [[ BATCH REPORT ]]    \n" + helper.bcolors.ENDC)
+        for result in results:
+            if result["status"] in ("failed", "timeout"):
+                color = helper.bcolors.FAIL
+            else:
+                color = helper.bcolors.OKGREEN
+            print(color + "{:<8}".format(result["status"].upper()) + helper.bcolors.ENDC +
+                  " {:>8.3f}s {:>8.3f}s  {}".format(result["translate"], result["compile"], result["file"]))
+            if result["output"]:
+                print(result["output"])
+
+        failed = len([i for i in results if i["status"] in ("failed", "timeout")])
+        print("\n{} PROGRAMS, {} FAILED".format(len(results), failed))
+
+        if path != None:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=4)
+
+        return failed == 0
@@ -0,0 +1,240 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Build cache for ELang. Finished binaries are stored by a hash of
+    everything that decides what g++ would produce, so a rebuild of an
+    unchanged program can skip the compiler entirely.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+
+from core.misc import profiles
+from core.misc.runner import Runner
+
+
+class BuildCache():
+    '''
+    This is a size capped, least recently used cache of compiled binaries
+    '''
+    def __init__(self, config, path=None):
+        self.config = config
+        self.enabled = config.get("Cache", True)
+        # CacheSize is in megabytes
+        self.limit = int(config.get("CacheSize", 256)) * 1024 * 1024
+        if path == None:
+            path = os.path.join(os.getcwd(), ".elang_cache")
+        self.path = os.path.join(path, "builds")
+
+    def compiler_version(self):
+        return compiler_version(self.config["G++Path"])
+
+    def key(self, code_digest):
+        '''
+        Returns the cache key for the sha256 hex digest of the generated code
+        '''
+        digest = hashlib.sha256()
+        digest.update(code_digest.encode("utf-8"))
+        digest.update(b"\0" + str(self.config["G++Path"]).encode("utf-8"))
+        digest.update(b"\0" + " ".join(profiles.flags(self.config)).encode("utf-8"))
+        digest.update(b"\0" + profiles.training(self.config))
+        digest.update(b"\0" + self.compiler_version())
+        return digest.hexdigest()
+
+    def restore(self, key, target):
+        '''
+        Copies the cached binary for key to target, returns False on a miss
+        '''
+        if not self.enabled:
+            return False
+
+        cached = os.path.join(self.path, key)
+        try:
+            shutil.copy2(cached, target)
+            # Touching the entry marks it as recently used for eviction
+            os.utime(cached, None)
+        except OSError:
+            # Missing, or evicted by another build meanwhile
+            return False
+        return True
+
+    def store(self, key, binary):
+        if not self.enabled or not os.path.isfile(binary):
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        cached = os.path.join(self.path, key)
+        # Copy next to the final name and rename, so a half written entry
+        # is never seen by another build. Every build, even in the threads
+        # of one process, gets a temporary file of its own.
+        temp = self.temp()
+        try:
+            shutil.copy2(binary, temp)
+            os.replace(temp, cached)
+        except OSError:
+            remove(temp)
+            return
+        self.evict()
+
+    def temp(self):
+        handle, temp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        os.close(handle)
+        return temp
+
+    def has(self, key):
+        return self.enabled and os.path.isfile(os.path.join(self.path, key))
+
+    def evict(self):
+        '''
+        Deletes least recently used entries until the cache fits its limit
+        '''
+        evict(self.path, self.limit)
+
+
+class ObjectCache(BuildCache):
+    '''
+    This is a cache of object files of single translation units, so a
+    program split into many units only compiles the ones that changed
+    '''
+    def __init__(self, config, path=None, runner=None):
+        BuildCache.__init__(self, config, path)
+        self.path = os.path.join(os.path.dirname(self.path), "objects")
+        self.runner = runner or Runner(config.get("Timeout"))
+
+    def key(self, code, arguments):
+        digest = hashlib.sha256()
+        digest.update(code.encode("utf-8"))
+        digest.update(b"\0" + str(self.config["G++Path"]).encode("utf-8"))
+        digest.update(b"\0" + " ".join(str(i) for i in arguments).encode("utf-8"))
+        digest.update(b"\0" + self.compiler_version())
+        return digest.hexdigest()
+
+    def build(self, units, arguments):
+        '''
+        Returns the object file of every unit, given as its code, compiling
+        the missing ones side by side with arguments. Returns None and the
+        failed results when any of them did not compile.
+        '''
+        os.makedirs(self.path, exist_ok=True)
+        objects = []
+        missing = []
+        for code in units:
+            obj = os.path.join(self.path, self.key(code, arguments) + ".o")
+            objects.append(obj)
+            if self.enabled and os.path.isfile(obj):
+                os.utime(obj, None)
+            else:
+                missing.append((code, obj))
+
+        # Every unit is written aside and renamed into place when done
+        temps = [self.temp() for code, obj in missing]
+        commands = [
+            [self.config["G++Path"], "-c", "-x", "c++", "-", "-o", temp] + list(arguments)
+            for temp in temps
+        ]
+        results = self.runner.run_many(commands, inputs=[code for code, obj in missing])
+
+        failed = []
+        for (code, obj), temp, result in zip(missing, temps, results):
+            if result.ok:
+                os.replace(temp, obj)
+            else:
+                failed.append(result)
+                remove(temp)
+
+        self.evict()
+        if failed:
+            return None, failed
+        return objects, []
+
+
+def remove(path):
+    try:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+    except OSError:
+        pass
+
+
+def size(path):
+    '''
+    Returns the size of a file, or of everything in a folder
+    '''
+    if not os.path.isdir(path):
+        return os.stat(path).st_size
+    total = 0
+    for root, folders, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def evict(path, limit, keep=()):
+    '''
+    Deletes the least recently used entries of the folder path, files or
+    folders, until they fit in limit bytes. Entries in keep stay.
+    '''
+    entries = []
+    total = 0
+    for name in os.listdir(path):
+        if name.endswith(".tmp"):
+            continue
+        entry = os.path.join(path, name)
+        try:
+            stat = os.stat(entry)
+            entry_size = size(entry)
+        except OSError:
+            # Evicted by another build meanwhile
+            continue
+        entries.append((stat.st_mtime, entry_size, entry))
+        total += entry_size
+
+    entries.sort()
+    for mtime, entry_size, entry in entries:
+        if total <= limit:
+            break
+        if entry in keep:
+            continue
+        remove(entry)
+        total -= entry_size
+
+
+versions = {}
+
+
+def compiler_version(path):
+    '''
+    Returns the version banner of a compiler, so an upgrade of g++ never
+    reuses anything built by the old one
+    '''
+    path = str(path)
+    if path not in versions:
+        try:
+            reply = subprocess.run(
+                [path, "--version"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+            versions[path] = reply.stdout
+        except OSError:
+            versions[path] = b""
+    return versions[path]
+
+
+def binary_path(name):
+    '''
+    Returns the file g++ writes for an output name on this system
+    '''
+    if os.name == "nt" and not str(name).lower().endswith(".exe"):
+        return str(name) + ".exe"
+    return str(name)
@@ -9,9 +9,12 @@
 
 # MAIN MODULES NEEDED
 from platform import system
-import yaml
+import json
 import os
 
+from core.misc import logger, profiles
+from core.misc.runner import Runner
+
 class bcolors:
     HEADER = '\033[95m'
     OKBLUE = '\033[94m'
@@ -26,22 +29,28 @@ class Checkup():
     '''
     This is a class for setting up the initialization of a simple project
     '''
-    def __init__(self, logger, util):
+    def __init__(self, logger, util, runner=None):
         self.logger = logger
         self.EUtil = util
+        self.runner = runner or Runner()
 
-    def init(self):
+    def init(self, path=None, clear=True):
         '''
         This will check up for required files and generate them if they were not present!
+        The project is looked up in path, the current directory by default.
         '''
 
-        self.EUtil.clearScreen()
+        if clear:
+            self.EUtil.clearScreen()
+
+        if path == None:
+            path = os.getcwd()
 
         # set up path to config.yml
-        PATH_TO_CONFIG = os.path.join(os.getcwd(), 'config.yml')
-        PATH_TO_CODE = os.path.join(os.getcwd(), "compile.elpp")
+        PATH_TO_CONFIG = os.path.join(path, 'config.yml')
+        PATH_TO_CODE = os.path.join(path, "compile.elpp")
 
-        PATH_TO_WIN_GCC = os.path.join(os.getcwd(), "compilers")
+        PATH_TO_WIN_GCC = os.path.join(path, "compilers")
         PATH_TO_WIN_GCC = os.path.join(PATH_TO_WIN_GCC, "cpp")
         PATH_TO_WIN_GCC = os.path.join(PATH_TO_WIN_GCC, "64")
         PATH_TO_WIN_GCC = os.path.join(PATH_TO_WIN_GCC, "bin")
@@ -49,6 +58,14 @@ class Checkup():
 
         details = {"config": False, "code": False}
 
+        # A project whose configuration is unchanged since the last run
+        # needs no searching or generating at all
+        config = self.cached(PATH_TO_CONFIG)
+        if config != None and os.path.isfile(PATH_TO_CODE):
+            details['config'] = config
+            details['code'] = True
+            return details
+
         # check for config.yml
         self.logger.logNormal("    Searching for config.yml\n")
         print(bcolors.HEADER + "    [[ SEARCHING FOR CONFIGURATION ]]    ")
@@ -61,11 +78,10 @@ class Checkup():
             # trying to load it
             try:
                 print(bcolors.HEADER + "\n    [[ LOADING CONFIGURATION ]]    ")
-                with open(PATH_TO_CONFIG, 'r') as f:
-                    config = yaml.load(f.read())
-                    print("\n" + bcolors.OKGREEN + "CONFIGURATION SUCCESSFULLY LOADED!")
-                    self.logger.logNormal("    config.yml LOADED!\n")
-                    details['config'] = config
+                config = self.load(PATH_TO_CONFIG)
+                print("\n" + bcolors.OKGREEN + "CONFIGURATION SUCCESSFULLY LOADED!")
+                self.logger.logNormal("    config.yml LOADED!\n")
+                details['config'] = config
 
             # If we can't load it...
             except Exception as e:
@@ -87,7 +103,7 @@ class Checkup():
                 self.logger.logNormal('TRYING TO GENERATE CONFIGURATION FILE\n')
                 if system() == "Windows":
                     with open(PATH_TO_CONFIG, 'w') as f:
-                        f.write("Name: compile\nFileName: compile.elpp\nlanguage: c++\nG++Path: {}\nFlags: ''\nCompileOnly: false".format(PATH_TO_WIN_GCC))
+                        f.write("Name: compile\nFileName: compile.elpp\nlanguage: c++\nG++Path: {}\nFlags: ''\nProfile: release\nCompileOnly: false\nRuntime: prebuilt".format(PATH_TO_WIN_GCC))
                 
                     config = {
                         "Name": "compile",
@@ -95,12 +111,14 @@ class Checkup():
                         'language': 'c++',
                         'G++Path': str(PATH_TO_WIN_GCC),
                         'Flags': '',
-                        'CompileOnly': False
+                        'Profile': 'release',
+                        'CompileOnly': False,
+                        'Runtime': 'prebuilt'
                     }
                 
                 elif system() == "Linux":
                     with open(PATH_TO_CONFIG, 'w') as f:
-                        f.write("Name: compile\nFileName: compile.elpp\nlanguage: c++\nG++Path: g++\nFlags: ''\nCompileOnly: false")
+                        f.write("Name: compile\nFileName: compile.elpp\nlanguage: c++\nG++Path: g++\nFlags: ''\nProfile: release\nCompileOnly: false\nRuntime: prebuilt")
                 
                     config = {
                         "Name": "compile",
@@ -108,7 +126,9 @@ class Checkup():
                         'language': 'c++',
                         'G++Path': 'g++',
                         'Flags': '',
-                        'CompileOnly': False
+                        'Profile': 'release',
+                        'CompileOnly': False,
+                        'Runtime': 'prebuilt'
                     }
 
                 print("\n" + bcolors.OKGREEN + "CONFIGURATION GENERATED!")
@@ -157,13 +177,115 @@ class Checkup():
         
         return details
     
-    def command(self, command):
+    def load(self, path):
+        '''
+        Reads the configuration at path. What was read is kept in
+        .elang_cache by modification time and size, so yaml is only needed
+        once per change of the file.
         '''
-        Run console commands and check the results if successful or failed!
+        config = self.cached(path)
+        if config != None:
+            return config
+
+        import yaml
+        with open(path, 'r') as f:
+            config = yaml.safe_load(f.read())
+        self.check(config)
+
+        try:
+            stat = os.stat(path)
+            CACHE = self.config_cache(path)
+            os.makedirs(os.path.dirname(CACHE), exist_ok=True)
+            with open(CACHE + ".tmp", 'w') as f:
+                json.dump({"path": path, "stamp": [stat.st_mtime_ns, stat.st_size], "config": config}, f)
+            os.replace(CACHE + ".tmp", CACHE)
+        except (OSError, TypeError, ValueError):
+            # Not being able to cache is never a reason to fail
+            pass
+        return config
+
+    def check(self, config):
+        '''
+        Raises ValueError for settings nothing could be built with, so they
+        are reported with the configuration instead of failing a build
+        '''
+        if not isinstance(config, dict):
+            raise ValueError("CONFIGURATION MUST BE A MAPPING OF SETTINGS")
+        error = profiles.check(config)
+        if error != None:
+            raise ValueError(error)
+        if config.get("FileName") != None and not str(config["FileName"]).endswith(".elpp"):
+            raise ValueError("WRONG FILE EXTENTION FOR {}! MUST BE: .elpp".format(config["FileName"]))
+        if config.get("LogLevel") != None:
+            logger.level(config["LogLevel"])
+
+    def settings(self, path=None):
         '''
-        if os.system(command) == 0:
-            print(bcolors.OKBLUE + "\nSUCCESSFUL!")
-            self.logger.logNormal("COMMAND '{}' HAS BEEN RUN SUCCESSFULLY!\n".format(command))
+        Returns the configuration of the project in path without generating
+        anything, the defaults when it has no config.yml and False when it
+        can't be read. Batch builds take their settings from here.
+        '''
+        if path == None:
+            path = os.getcwd()
+        PATH_TO_CONFIG = os.path.join(path, 'config.yml')
+
+        if not os.path.isfile(PATH_TO_CONFIG):
+            return {
+                "Name": "compile",
+                'FileName': 'compile.elpp',
+                'language': 'c++',
+                'G++Path': 'g++',
+                'Flags': '',
+                'Profile': 'release',
+                'CompileOnly': False,
+                'Runtime': 'prebuilt'
+            }
+        try:
+            return self.load(PATH_TO_CONFIG)
+        except Exception as e:
+            error = "\nERROR: CAN'T READ CONFIGURATION AT {}! ERROR: {}".format(PATH_TO_CONFIG, e)
+            print(bcolors.FAIL + error)
+            self.logger.logError("    " + error, PATH_TO_CONFIG)
+            return False
+
+    def config_cache(self, path):
+        return os.path.join(os.path.dirname(path), ".elang_cache", "config.json")
+
+    def cached(self, path):
+        '''
+        Returns the cached configuration of path if the file is unchanged, or None
+        '''
+        try:
+            stat = os.stat(path)
+            with open(self.config_cache(path), 'r') as f:
+                cached = json.load(f)
+            if cached["path"] == path and cached["stamp"] == [stat.st_mtime_ns, stat.st_size]:
+                return cached["config"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def report(self, result):
+        '''
+        Shows the outcome of a finished command, returns True if it was successful
+        '''
+        line = " ".join(str(i) for i in result.argv)
+
+        # g++ warnings and errors are shown either way
+        if result.stdout:
+            print(result.stdout)
+        if result.stderr:
+            print(result.stderr)
+
+        if result.ok:
+            print(bcolors.OKBLUE + "\nSUCCESSFUL! ({:.2f}s)".format(result.elapsed))
+            self.logger.logNormal("COMMAND '{}' HAS BEEN RUN SUCCESSFULLY IN {:.2f}s!\n".format(line, result.elapsed))
+            return True
+        elif result.timed_out:
+            print(bcolors.FAIL + "\nTIMED OUT AFTER {:.2f}s!".format(result.elapsed))
+            self.logger.logError("COMMAND '{}' HAS TIMED OUT!\n".format(line), "COULD NOT COMPILE!")
+            return False
         else:
-            print(bcolors.FAIL + "\nFAILED!")
-            self.logger.logError("COMMAND '{}' HAS BEEN RUN UNSUCCESSFULLY!\n".format(command), "COULD NOT COMPILE!")
\ No newline at end of file
+            print(bcolors.FAIL + "\nFAILED WITH EXIT STATUS {}!".format(result.returncode))
+            self.logger.logError("COMMAND '{}' HAS BEEN RUN UNSUCCESSFULLY!\n".format(line), "COULD NOT COMPILE!")
+            return False
@@ -1,14 +1,200 @@
-import logging
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Logging of ELang. Messages below the configured level are dropped
+    before logging is even imported, the rest are put on a queue and
+    written to a size rotated log file of the project by a background
+    thread, so logging never waits on the disk. Worker processes put their
+    messages on a queue of the process that started them, so only one
+    process ever writes and rotates the file.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
 import os
 
+LEVELS = {
+    "DEBUG": 10,
+    "INFO": 20,
+    "WARNING": 30,
+    "ERROR": 40,
+    "QUIET": 100
+}
+
+
+def default_level():
+    # Only warnings and errors are written unless asked for more
+    name = os.environ.get("ELANG_LOG_LEVEL", "WARNING").upper()
+    return LEVELS.get(name, LEVELS["WARNING"])
+
+
+settings = {
+    "level": default_level(),
+    "path": None,
+    "size": 1024 * 1024,
+    "backups": 3
+}
+
+# The listener of this process, a forked process starts its own unless
+# it joined the queue of its parent
+state = {"pid": None, "logger": None, "handler": None, "listener": None, "shared": None, "shared_listener": None}
+
+
+def level(name):
+    '''
+    Returns the number of a level given by name or number
+    '''
+    if isinstance(name, int):
+        return name
+    name = str(name).upper()
+    if name not in LEVELS:
+        raise ValueError("UNKNOWN LOG LEVEL {}! MUST BE ONE OF: {}".format(name, ", ".join(LEVELS)))
+    return LEVELS[name]
+
+
+def configure(log_level=None, path=None, size=None, backups=None):
+    '''
+    Sets the level, the log file and its rotation for every Log of this
+    process, a changed file takes effect with a new listener
+    '''
+    if log_level != None:
+        settings["level"] = level(log_level)
+    if size != None:
+        settings["size"] = size
+    if backups != None:
+        settings["backups"] = backups
+    if path != None and path != settings["path"]:
+        settings["path"] = path
+        stop()
+
+
+def log_path():
+    # Every project keeps its own log, next to its other caches
+    return settings["path"] or os.path.join(os.getcwd(), ".elang_cache", "log.txt")
+
+
+def start():
+    '''
+    Returns the logger of this process, starting the queue and the thread
+    writing it to the log file on the first call
+    '''
+    if state["pid"] == os.getpid():
+        return state["logger"]
+
+    import logging
+    import logging.handlers
+    import queue
+
+    path = log_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=settings["size"], backupCount=settings["backups"], delay=True)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(process)d %(levelname)s %(message)s"))
+
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, handler)
+    listener.start()
+
+    log = logging.getLogger("elang")
+    log.handlers = [logging.handlers.QueueHandler(records)]
+    log.setLevel(logging.DEBUG)
+    log.propagate = False
+
+    if state["pid"] == None:
+        import atexit
+        atexit.register(stop)
+
+    state["pid"] = os.getpid()
+    state["logger"] = log
+    state["handler"] = handler
+    state["listener"] = listener
+    return log
+
+
+def share():
+    '''
+    Returns a queue for worker processes to log through, see join(). What
+    they put on it is written by a thread of this process.
+    '''
+    start()
+    if state["shared"] == None:
+        import logging.handlers
+        import multiprocessing
+
+        shared = multiprocessing.Queue()
+        listener = logging.handlers.QueueListener(shared, state["handler"])
+        listener.start()
+        state["shared"] = shared
+        state["shared_listener"] = listener
+    return state["shared"]
+
+
+def join(shared, log_level):
+    '''
+    Makes this worker process log through the queue of the process that
+    started it, given to it by share()
+    '''
+    import logging
+    import logging.handlers
+
+    settings["level"] = log_level
+    log = logging.getLogger("elang")
+    log.handlers = [logging.handlers.QueueHandler(shared)]
+    log.setLevel(logging.DEBUG)
+    log.propagate = False
+
+    state["pid"] = os.getpid()
+    state["logger"] = log
+    state["handler"] = None
+    state["listener"] = None
+    state["shared"] = None
+    state["shared_listener"] = None
+
+
+def stop():
+    '''
+    Writes out everything still queued and stops the threads
+    '''
+    if state["pid"] == os.getpid():
+        if state["shared_listener"] != None:
+            state["shared_listener"].stop()
+            state["shared"].close()
+        if state["listener"] != None:
+            state["listener"].stop()
+            state["handler"].close()
+    state["pid"] = None
+    state["logger"] = None
+    state["handler"] = None
+    state["listener"] = None
+    state["shared"] = None
+    state["shared_listener"] = None
+
+
 class Log():
-    def __init__(self):
-        filename = os.path.join(os.getcwd(), 'core')
-        filename = os.path.join(filename, 'log.txt')
-        logging.basicConfig(filename=filename, level=logging.INFO)
-    
+    '''
+    This is a class for logging messages of the compiler
+    '''
+    def __init__(self, log_level=None):
+        self.level = None if log_level == None else level(log_level)
+
+    def enabled(self, number):
+        return number >= (settings["level"] if self.level == None else self.level)
+
+    def logNormal(self, string):
+        if self.enabled(LEVELS["INFO"]):
+            start().info(string)
+
+    def logError(self, error, code):
+        if self.enabled(LEVELS["ERROR"]):
+            start().error("ERR: {}! ON {}.".format(error, code))
+
+
+class NullLog():
+    '''
+    A logger that drops every message, for embedding ELang as a library
+    '''
     def logNormal(self, string):
-        logging.info(string)
-    
+        pass
+
     def logError(self, error, code):
-        logging.error("ERR: {}! ON {}.".format(error, code))
\ No newline at end of file
+        pass
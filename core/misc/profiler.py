@@ -0,0 +1,107 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Records where a build spends its time: wall time, statement count and
+    peak memory of every translator phase and the duration of the compiler
+    subprocess. The report is JSON, so it can be fed to other tools.
+
+    For license, Please refer to LICENSE file in the master branch.
+
+    Usage:
+        profiler = Profiler()
+        ELangObject.profiler = profiler
+        ELangObject.compile()
+        profiler.write("profile.json")
+'''
+
+import contextlib
+import json
+import sys
+import time
+
+
+class Profiler():
+    '''
+    This is a class for timing the phases of one or more builds. memory
+    traces allocations with tracemalloc, which slows the translator down,
+    and cprofile is a file to dump cProfile stats of the phases to.
+    '''
+    def __init__(self, memory=True, cprofile=None):
+        self.memory = memory
+        self.cprofile = cprofile
+        self.stats = None
+        self.tracemalloc = None
+        self.clear()
+
+        if memory:
+            import tracemalloc
+            self.tracemalloc = tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        if cprofile:
+            import cProfile
+            self.stats = cProfile.Profile()
+
+    def clear(self):
+        '''
+        Forgets every phase recorded so far
+        '''
+        self.phases = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        '''
+        Times the statements of a with block as the phase name. The entry
+        is given to the block, which can add its statement count to it.
+        '''
+        entry = {"name": name}
+        if self.tracemalloc:
+            self.tracemalloc.reset_peak()
+            before = self.tracemalloc.get_traced_memory()[0]
+        if self.stats:
+            self.stats.enable()
+
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["seconds"] = time.perf_counter() - start
+            if self.stats:
+                self.stats.disable()
+            if self.tracemalloc:
+                # Peak of what the phase allocated on top of what was there
+                entry["peak_memory"] = self.tracemalloc.get_traced_memory()[1] - before
+            self.phases.append(entry)
+
+    def record(self, name, seconds, **details):
+        '''
+        Adds a phase that ran elsewhere, like a compiler subprocess
+        '''
+        entry = {"name": name, "seconds": seconds}
+        entry.update(details)
+        self.phases.append(entry)
+
+    def report(self):
+        return {
+            "phases": self.phases,
+            "seconds": sum(i["seconds"] for i in self.phases)
+        }
+
+    def write(self, path=None):
+        '''
+        Writes the report as JSON to path, or to stderr if path is None or -,
+        and the cProfile stats to their file
+        '''
+        if path == None or path == "-":
+            json.dump(self.report(), sys.stderr, indent=4)
+            sys.stderr.write("\n")
+        else:
+            with open(path, "w") as f:
+                json.dump(self.report(), f, indent=4)
+
+        if self.stats:
+            self.stats.dump_stats(self.cprofile)
+
+    def close(self):
+        if self.tracemalloc and self.tracemalloc.is_tracing():
+            self.tracemalloc.stop()
@@ -0,0 +1,137 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Build profiles of config.yml. A profile is a named set of g++ flags put
+    in front of the free form Flags, the pgo profile also trains the binary
+    and builds it a second time with the collected profile.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import hashlib
+import os
+import shlex
+import shutil
+
+PROFILES = {
+    "debug": ["-O0"],
+    "release": ["-O2"],
+    "aggressive": ["-O3", "-flto", "-march=native"],
+    "pgo": ["-O2"]
+}
+
+
+def check(config):
+    '''
+    Returns what is wrong with the profile of config, or None
+    '''
+    profile = config.get("Profile")
+    if profile != None and profile not in PROFILES:
+        return "UNKNOWN PROFILE {}! MUST BE ONE OF: {}".format(profile, ", ".join(PROFILES))
+    return None
+
+
+def flags(config):
+    '''
+    Returns the g++ flags of the configured profile followed by Flags
+    '''
+    error = check(config)
+    if error != None:
+        raise ValueError(error)
+    profile = config.get("Profile")
+
+    reply = list(PROFILES.get(profile, []))
+    reply += split(config.get("Flags"))
+    return reply
+
+
+def training(config):
+    '''
+    Returns what the training run of a pgo build depends on, so the build
+    cache can tell trainings apart
+    '''
+    if config.get("Profile") != "pgo":
+        return b""
+
+    reply = str(config.get("PGOArgs") or "").encode("utf-8")
+    reply += b"\0" + str(config.get("PGOCommand") or "").encode("utf-8")
+    path = config.get("PGOInput")
+    if path and os.path.isfile(path):
+        with open(path, "rb") as f:
+            reply += b"\0" + hashlib.sha256(f.read()).hexdigest().encode("utf-8")
+    return reply
+
+
+def split(line):
+    return shlex.split(str(line or ""), posix=(os.name != "nt"))
+
+
+def trainer(config, binary):
+    '''
+    Returns the training command of config. PGOCommand runs a command of
+    its own, with {binary} standing for the instrumented binary, otherwise
+    the binary is run with PGOArgs.
+    '''
+    if config.get("PGOCommand"):
+        return [i.replace("{binary}", binary) for i in split(config["PGOCommand"])]
+    return [binary] + split(config.get("PGOArgs"))
+
+
+def profiled(folder):
+    '''
+    Returns True if a training run left profile data in folder
+    '''
+    for root, folders, files in os.walk(folder):
+        if any(name.endswith(".gcda") for name in files):
+            return True
+    return False
+
+
+def pgo_build(runner, command, config, binary, logger=None, input=None):
+    '''
+    Builds command instrumented, runs the training command of config and
+    builds the binary again with the profile. Returns the runner result
+    of the step that failed or of the final build. input is the code for
+    commands reading it from stdin.
+    '''
+    # Programs of the same name in other folders may be trained meanwhile
+    binary = os.path.abspath(str(binary))
+    name = os.path.basename(binary) + "-" + hashlib.sha256(binary.encode("utf-8")).hexdigest()[:16]
+    folder = os.path.join(os.getcwd(), ".elang_cache", "pgo", name)
+    # Profiles of an older build of the program would only mislead g++
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder, exist_ok=True)
+
+    result = runner.run(command + ["-fprofile-generate=" + folder], input=input)
+    if not result.ok:
+        return result
+
+    train = trainer(config, binary)
+    if config.get("PGOInput"):
+        with open(config["PGOInput"], "r") as f:
+            trained = runner.run(train, stdin=f)
+    else:
+        trained = runner.run(train)
+    if logger != None:
+        logger.logNormal("PGO TRAINING RUN FINISHED WITH {} IN {:.2f}s\n".format(trained.returncode, trained.elapsed))
+    if trained.timed_out:
+        return trained
+
+    if not profiled(folder):
+        # g++ says so for every unit too, the build is just not optimized
+        from core.misc import helper
+        warning = "NO PROFILE WAS WRITTEN BY THE TRAINING RUN {}! THE BINARY IS BUILT WITHOUT IT.".format(" ".join(train))
+        print(helper.bcolors.WARNING + "\n" + warning + helper.bcolors.ENDC)
+        if logger != None:
+            logger.logNormal(warning + "\n")
+
+    result = runner.run(command + [
+        "-fprofile-use=" + folder,
+        "-fprofile-correction"
+    ], input=input)
+
+    # Profiles are capped like the other caches, the one just used stays
+    from core.misc import cache
+    os.utime(folder, None)
+    cache.evict(os.path.dirname(folder), int(config.get("CacheSize", 256)) * 1024 * 1024, (folder,))
+    return result
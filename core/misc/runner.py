@@ -0,0 +1,100 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Runs compiler jobs as argument lists, without a shell, with timeouts and
+    captured output. Jobs can be run side by side in a bounded pool.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import os
+import signal
+import subprocess
+import time
+
+
+class Result():
+    '''
+    Outcome of one job
+    '''
+    def __init__(self, argv, returncode, stdout, stderr, elapsed, timed_out=False):
+        self.argv = argv
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.elapsed = elapsed
+        self.timed_out = timed_out
+
+    @property
+    def ok(self):
+        return self.returncode == 0 and not self.timed_out
+
+    def __repr__(self):
+        return "Result({!r}, returncode={}, elapsed={:.3f})".format(self.argv, self.returncode, self.elapsed)
+
+
+class Runner():
+    '''
+    This is a class for running compiler commands
+    '''
+    def __init__(self, timeout=None, jobs=None):
+        self.timeout = timeout
+        self.jobs = jobs or os.cpu_count() or 1
+
+    def run(self, argv, timeout=None, cwd=None, stdin=None, input=None):
+        '''
+        Runs argv and waits for it, killing it and everything it started
+        once timeout seconds have passed. stdin is an open file or None to
+        give the job no input at all, input is text to pipe to the job.
+        '''
+        if timeout == None:
+            timeout = self.timeout
+
+        start = time.time()
+        try:
+            process = subprocess.Popen(
+                [str(i) for i in argv],
+                stdin=subprocess.PIPE if input != None else stdin if stdin != None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                cwd=cwd,
+                # g++ starts cc1plus and as, a session lets us stop them all
+                start_new_session=(os.name != "nt")
+            )
+        except OSError as e:
+            return Result(argv, 127, "", str(e), time.time() - start)
+
+        try:
+            stdout, stderr = process.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.kill(process)
+            stdout, stderr = process.communicate()
+            return Result(argv, process.returncode, stdout, stderr, time.time() - start, True)
+        except BaseException:
+            # Ctrl+C or any error here must not leave the job running on its own
+            self.kill(process)
+            process.communicate()
+            raise
+
+        return Result(argv, process.returncode, stdout, stderr, time.time() - start)
+
+    def kill(self, process):
+        if os.name == "nt":
+            process.kill()
+        else:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                process.kill()
+
+    def run_many(self, commands, timeout=None, inputs=None):
+        '''
+        Runs a list of argv at most self.jobs at a time, results keep the
+        order of commands. inputs is the text to pipe to every command.
+        '''
+        if inputs == None:
+            inputs = [None] * len(commands)
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(self.jobs) as pool:
+            return list(pool.map(lambda job: self.run(job[0], timeout, input=job[1]), zip(commands, inputs)))
@@ -0,0 +1,75 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Watches project files for changes by polling. A file only counts as
+    changed when its content did, so saving it untouched or touching it
+    never causes a rebuild.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import hashlib
+import os
+import time
+
+
+class Watcher():
+    '''
+    This is a class for waiting on changes to a list of files
+    '''
+    def __init__(self, paths, interval=0.5):
+        self.interval = interval
+        self.watch(paths)
+
+    def watch(self, paths):
+        '''
+        Starts over watching paths as they are now
+        '''
+        self.paths = list(paths)
+        self.stats = {}
+        self.hashes = {}
+        for path in self.paths:
+            self.stats[path] = self.stat(path)
+            self.hashes[path] = self.hash(path)
+
+    def stat(self, path):
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def hash(self, path):
+        try:
+            with open(path, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    def changed(self):
+        '''
+        Returns the paths whose content changed since the last call
+        '''
+        reply = []
+        for path in self.paths:
+            stat = self.stat(path)
+            # Reading the file is only needed once its stat moved
+            if stat == self.stats[path]:
+                continue
+            self.stats[path] = stat
+
+            digest = self.hash(path)
+            if digest != self.hashes[path]:
+                self.hashes[path] = digest
+                reply.append(path)
+        return reply
+
+    def wait(self):
+        '''
+        Blocks until at least one path changed and returns the changed paths
+        '''
+        while True:
+            reply = self.changed()
+            if reply:
+                return reply
+            time.sleep(self.interval)
@@ -0,0 +1,158 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Modules of ELang. A file can include others with
+        include other.elpp
+    which puts the statements of that file in its place, once per program.
+    Includes are resolved into a graph of modules, each loaded through its
+    own .elpc so only a changed file is parsed again. The linked program is
+    cached by a hash of every module it is made of, so while none of them
+    changed it is neither linked nor optimized again.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import hashlib
+import os
+
+from core import ir, elpc
+from core.misc import cache
+
+
+class Loader():
+    '''
+    This is a class for resolving the includes of a program into one list
+    of statements
+    '''
+    def __init__(self, parser, cache=True, path=None):
+        self.parser = parser
+        self.cache = cache
+        if path == None:
+            path = os.path.join(os.getcwd(), ".elang_cache")
+        self.path = os.path.join(path, "modules")
+        # Module path to its Compiled program
+        self.modules = {}
+        # Module path to the module of each of its includes, None when dropped
+        self.graph = {}
+        self.hashes = {}
+        # Modules that were parsed again for this program
+        self.parsed = []
+
+    def module(self, path):
+        '''
+        Returns the Compiled program of one module
+        '''
+        if self.cache:
+            compiled = elpc.load(self.parser, path)
+            if compiled != None and compiled.changed:
+                self.parsed.append(path)
+                compiled.save()
+            return compiled
+
+        try:
+            compiled = elpc.parse(self.parser, path)
+        except OSError:
+            self.parser.error("ERR: FILE {} NOT FOUND!".format(path))
+            return None
+        self.parsed.append(path)
+        return compiled
+
+    def resolve(self, path, compiled=None, stack=()):
+        '''
+        Loads the module at path and, depth first, everything it includes.
+        An include that would include its own file again is reported and
+        dropped.
+        '''
+        if path in self.graph:
+            return
+        if compiled == None:
+            compiled = self.module(path)
+        self.modules[path] = compiled
+        self.graph[path] = []
+        if compiled == None:
+            return
+
+        stack = stack + (path,)
+        for node in compiled.program:
+            if type(node) != ir.Include:
+                continue
+            # Includes are relative to the file they are written in
+            include = os.path.abspath(os.path.join(os.path.dirname(path), node.file))
+            if include in stack:
+                self.parser.error("ERR: INCLUDE CYCLE {}! ERR ON {}".format(
+                    " -> ".join(stack[stack.index(include):] + (include,)), node.file))
+                include = None
+            elif not os.path.isfile(include) and not os.path.isfile(elpc.compiled_path(include)):
+                self.parser.error("ERR: INCLUDED FILE {} DOES NOT EXIST! ERR ON {}".format(include, path))
+                include = None
+            else:
+                self.resolve(include, stack=stack)
+                if self.modules[include] == None:
+                    include = None
+            self.graph[path].append(include)
+
+    def hash(self, path):
+        '''
+        Returns the hash of a module and, in turn, of everything it
+        includes, which changes whenever any of those files does
+        '''
+        if path not in self.hashes:
+            digest = hashlib.sha256(self.modules[path].digest.encode("utf-8"))
+            for include in self.graph[path]:
+                digest.update(b"\0" + (b"-" if include == None else self.hash(include).encode("utf-8")))
+            self.hashes[path] = digest.hexdigest()
+        return self.hashes[path]
+
+    def link(self, path, seen):
+        '''
+        Returns the statements of a module with its includes put in place,
+        leaving out modules already in seen
+        '''
+        seen.add(path)
+        reply = []
+        includes = iter(self.graph[path])
+        for node in self.modules[path].program:
+            if type(node) != ir.Include:
+                reply.append(node)
+                continue
+            include = next(includes)
+            if include != None and include not in seen:
+                reply.extend(self.link(include, seen))
+        return reply
+
+    def load(self, file_name, compiled=None):
+        '''
+        Returns the linked program of file_name as a Compiled program,
+        compiled being the already loaded program of that file
+        '''
+        path = os.path.abspath(str(file_name))
+        self.resolve(path, compiled)
+        if self.modules[path] == None:
+            return None
+        if not self.cache:
+            return elpc.Compiled(None, None, self.link(path, set()))
+
+        key = self.hash(path)
+        cached = os.path.join(self.path, key + ".elpc")
+        linked = elpc.read(cached, key)
+        if linked != None:
+            # Touching the entry marks it as recently used for eviction
+            try:
+                os.utime(cached, None)
+            except OSError:
+                pass
+            return linked
+
+        linked = elpc.Compiled(cached, key, self.link(path, set()))
+        linked.changed = True
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            # Linked programs are capped like the other caches
+            cache.evict(self.path, int(self.parser.config.get("CacheSize", 256)) * 1024 * 1024)
+        except OSError:
+            pass
+        return linked
+
+
+def includes(program):
+    return any(type(node) == ir.Include for node in program)
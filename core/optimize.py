@@ -0,0 +1,396 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Optimization passes over the IR. They run between parsing and code
+    generation, take a list of statements and return a new list, and only
+    ever change a program in ways that keep what it prints and does.
+
+    The generator puts the values variables were declared with into
+    subtract, multiply, divide, write and append while translating, so
+    those statements and the variables they read are left to it.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import re
+
+from core import ir
+
+# Largest values an int literal can hold in the generated C++
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+COMPARISONS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b,
+    "<=": lambda a, b: a <= b,
+    ">=": lambda a, b: a >= b
+}
+
+# Statements opening a block that is closed by an End
+BLOCKS = (ir.If, ir.Define, ir.Foreach, ir.Repeat)
+
+# Loops with at most this many rounds and statements in all are unrolled
+UNROLL_COUNT = 8
+UNROLL_SIZE = 64
+
+IDENTIFIER = re.compile(r"[A-Za-z_]\w*")
+
+
+def number(value):
+    '''
+    Returns value as an int, or None when it is not an integer literal
+    '''
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def block_ends(program):
+    '''
+    Maps the index of every block opening statement to the End closing it
+    '''
+    ends = {}
+    opened = []
+    for index, node in enumerate(program):
+        if isinstance(node, BLOCKS):
+            opened.append(index)
+        elif isinstance(node, ir.End) and opened:
+            ends[opened.pop()] = index
+    return ends
+
+
+def calculate(node, left, right):
+    '''
+    Calculates an arithmetic statement the way the generated C++ would, or
+    returns None when it can't be done at translate time
+    '''
+    if isinstance(node, ir.Add):
+        result = left + right
+    elif isinstance(node, ir.Sub):
+        result = left - right
+    elif isinstance(node, ir.Mul):
+        result = left * right
+    else:
+        # "divide a by b in c" divides b by a, with C++ truncation
+        if left == 0:
+            return None
+        result = abs(right) // abs(left)
+        if (right < 0) != (left < 0):
+            result = -result
+
+    if result < INT_MIN or result > INT_MAX:
+        return None
+    return result
+
+
+def assigned(program):
+    '''
+    Returns every name the statements of program may assign
+    '''
+    names = set()
+    for node in program:
+        if isinstance(node, (ir.Var, ir.Change, ir.Take)):
+            names.add(node.name)
+        elif isinstance(node, (ir.Arithmetic, ir.Read)):
+            names.add(node.target)
+        elif isinstance(node, ir.Foreach):
+            names.add(node.var)
+    return names
+
+
+def pinned(program):
+    '''
+    Returns every name whose value at translate time is put into the code
+    of another statement by the generator
+    '''
+    names = set()
+    for node in program:
+        if isinstance(node, (ir.Sub, ir.Mul, ir.Div)):
+            names.add(node.left)
+            names.add(node.right)
+        elif isinstance(node, (ir.Write, ir.Append)):
+            names.add(node.var)
+    return names
+
+
+def fold_constants(program):
+    '''
+    Calculates arithmetic on known numbers, puts known values into later
+    uses of their variables and removes if blocks with constant conditions
+    '''
+    ends = block_ends(program)
+    fixed = pinned(program)
+    known = {}
+    declared = set()
+    # Ends of if blocks that are kept, and of those whose if was dropped
+    open_ends = set()
+    dropped_ends = set()
+    result = []
+
+    index = 0
+    while index < len(program):
+        node = program[index]
+        # Values are only remembered outside of conditional blocks
+        top = not open_ends
+
+        if isinstance(node, ir.Define):
+            # Function bodies are left as they are
+            end = ends.get(index, len(program) - 1)
+            result.extend(program[index:end + 1])
+            index = end + 1
+            continue
+
+        if isinstance(node, ir.End):
+            if index in dropped_ends:
+                dropped_ends.discard(index)
+            else:
+                open_ends.discard(index)
+                result.append(node)
+
+        elif isinstance(node, ir.Show):
+            if node.text in known:
+                node = ir.Show(str(known[node.text]))
+            result.append(node)
+
+        elif isinstance(node, ir.Var):
+            declared.add(node.name)
+            known.pop(node.name, None)
+            value = number(node.value)
+            if top and value != None:
+                known[node.name] = value
+            result.append(node)
+
+        elif isinstance(node, ir.Arithmetic) and node.target in fixed:
+            # Folding would change the value it has at translate time
+            declared.add(node.target)
+            known.pop(node.target, None)
+            result.append(node)
+
+        elif isinstance(node, ir.Arithmetic):
+            if isinstance(node, ir.Add):
+                left = known.get(node.left, node.left)
+                right = known.get(node.right, node.right)
+            else:
+                # The generator puts in the declared values of variables
+                left = node.left
+                right = node.right
+            value = None
+            if number(left) != None and number(right) != None:
+                value = calculate(node, number(left), number(right))
+
+            known.pop(node.target, None)
+            if value == None:
+                result.append(type(node)(str(left), str(right), node.target))
+            elif node.target in declared:
+                result.append(ir.Change(node.target, str(value)))
+            else:
+                result.append(ir.Var(node.target, str(value)))
+            if top and value != None:
+                known[node.target] = value
+            declared.add(node.target)
+
+        elif isinstance(node, ir.If):
+            left = known.get(node.left, node.left)
+            right = known.get(node.right, node.right)
+            end = ends.get(index)
+            if number(left) != None and number(right) != None and node.op in COMPARISONS and end != None:
+                if not COMPARISONS[node.op](number(left), number(right)):
+                    # Never true, drop the whole block
+                    index = end
+                elif plain(program[index + 1:end], declared):
+                    # Always true, keep the body without the if around it
+                    dropped_ends.add(end)
+                else:
+                    # What the body declares has to stay in its own scope
+                    open_ends.add(end)
+                    result.append(ir.If(str(left), node.op, str(right)))
+            else:
+                open_ends.add(end)
+                result.append(ir.If(str(left), node.op, str(right)))
+
+        elif isinstance(node, ir.Change):
+            value = known.get(node.value, node.value)
+            known.pop(node.name, None)
+            if top and number(value) != None:
+                known[node.name] = number(value)
+            result.append(ir.Change(node.name, str(value)))
+
+        elif isinstance(node, ir.Take):
+            declared.add(node.name)
+            known.pop(node.name, None)
+            result.append(node)
+
+        elif isinstance(node, ir.Read):
+            declared.add(node.target)
+            known.pop(node.target, None)
+            result.append(node)
+
+        elif isinstance(node, ir.Native):
+            # Native code can change anything
+            known.clear()
+            result.append(node)
+
+        elif isinstance(node, (ir.Foreach, ir.Repeat)):
+            # The body runs again after its own assignments, so nothing it
+            # assigns is known anywhere inside it
+            end = ends.get(index, len(program))
+            for name in assigned(program[index + 1:end]):
+                known.pop(name, None)
+            if isinstance(node, ir.Foreach):
+                declared.add(node.var)
+                known.pop(node.var, None)
+            else:
+                node = ir.Repeat(str(known.get(node.count, node.count)))
+            open_ends.add(ends.get(index))
+            result.append(node)
+
+        else:
+            result.append(node)
+
+        index += 1
+
+    return result
+
+
+def unroll_loops(program):
+    '''
+    Writes out repeat blocks with a small constant count as copies of their
+    body. Bodies that declare anything are kept as loops, since a copy
+    would declare it twice.
+    '''
+    ends = block_ends(program)
+    declared = set()
+    result = []
+
+    index = 0
+    while index < len(program):
+        node = program[index]
+        end = ends.get(index)
+
+        if isinstance(node, ir.Repeat) and end != None and number(node.count) != None:
+            count = number(node.count)
+            body = program[index + 1:end]
+            if count <= 0:
+                index = end + 1
+                continue
+            if count <= UNROLL_COUNT and count * len(body) <= UNROLL_SIZE and plain(body, declared):
+                for i in range(count):
+                    result.extend(body)
+                index = end + 1
+                continue
+
+        if isinstance(node, (ir.Var, ir.Take)):
+            declared.add(node.name)
+        elif isinstance(node, (ir.Arithmetic, ir.Read)):
+            declared.add(node.target)
+        result.append(node)
+        index += 1
+
+    return result
+
+
+def plain(body, declared):
+    '''
+    Returns True when body declares nothing and can be copied as it is
+    '''
+    for node in body:
+        if isinstance(node, (ir.Var, ir.Take, ir.Read, ir.Define, ir.Foreach, ir.Repeat, ir.Native)):
+            return False
+        if isinstance(node, ir.Arithmetic) and node.target not in declared:
+            return False
+    return True
+
+
+def reads(node):
+    '''
+    Returns the names a statement reads
+    '''
+    if isinstance(node, ir.Show):
+        return [node.text]
+    if isinstance(node, (ir.Arithmetic, ir.If)):
+        return [node.left, node.right]
+    if isinstance(node, (ir.Write, ir.Append)):
+        return [node.var]
+    if isinstance(node, ir.Call):
+        return [node.name] + list(node.args)
+    if isinstance(node, ir.Change):
+        return [node.value]
+    if isinstance(node, (ir.Read, ir.Foreach)):
+        return [node.file]
+    if isinstance(node, ir.Repeat):
+        return [node.count]
+    if isinstance(node, ir.Take):
+        # Input is always taken, so its variable always stays
+        return [node.name]
+    if isinstance(node, ir.Native):
+        # Anything that looks like a name may be used by native code
+        return IDENTIFIER.findall(node.code)
+    return []
+
+
+def writes(node):
+    '''
+    Returns the name a statement only writes and can be removed with, or None
+    '''
+    if isinstance(node, (ir.Var, ir.Change, ir.Define)):
+        return node.name
+    if isinstance(node, (ir.Arithmetic, ir.Read)):
+        return node.target
+    return None
+
+
+def eliminate_dead_code(program):
+    '''
+    Removes assignments to variables nothing reads and functions nothing
+    calls, along with everything inside them
+    '''
+    ends = block_ends(program)
+    alive = [True] * len(program)
+    count = {}
+    writers = {}
+
+    for index, node in enumerate(program):
+        for name in reads(node):
+            count[name] = count.get(name, 0) + 1
+        name = writes(node)
+        if name != None:
+            # A define is removed with its whole body
+            end = ends.get(index, index) if isinstance(node, ir.Define) else index
+            writers.setdefault(name, []).append((index, end))
+
+    unused = [name for name in writers if count.get(name, 0) == 0]
+    while unused:
+        name = unused.pop()
+        if count.get(name, 0) != 0:
+            continue
+        for start, end in writers.pop(name, []):
+            if not alive[start]:
+                continue
+            for index in range(start, end + 1):
+                if not alive[index]:
+                    continue
+                alive[index] = False
+                # What the removed statement read may now be unused too
+                for read in reads(program[index]):
+                    count[read] -= 1
+                    if count[read] == 0:
+                        unused.append(read)
+
+    return [node for index, node in enumerate(program) if alive[index]]
+
+
+def run(program, config):
+    '''
+    Runs the optimization passes turned on in config over program
+    '''
+    if not config.get("Optimize", True):
+        return program
+
+    program = fold_constants(program)
+    program = unroll_loops(program)
+    program = eliminate_dead_code(program)
+    return program
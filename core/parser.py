@@ -0,0 +1,249 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Front end of ELang, shared by every language. It reads .elpp files and
+    turns their lines into the statements of core.ir.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+from os.path import isfile, abspath
+
+from core import ir, elpc, modules, optimize
+
+
+class Parser():
+    # Types and keywords of the language, also read by tools that write ELang code
+    data_types = ["string", "int"]
+    features = [
+        "show",
+        "variable",
+        "add",
+        "subtract",
+        "multiply",
+        "divide",
+        "take",
+        "read",
+        "write",
+        "append",
+        "if",
+        "end",
+        "define",
+        "function",
+        "change",
+        "native",
+        "run",
+        "foreach",
+        "repeat",
+        "include"
+    ]
+
+    def __init__(self, logger, colors):
+        self.logger = logger()
+        self.colors = colors
+        self.filename = "compile.elpp"
+        # Errors in the program are only collected, not printed, when quiet
+        self.quiet = False
+        self.errors = []
+        # The .elpc the last program was loaded from, if any
+        self.compiled = None
+        # Files the last program was made of, itself and what it includes
+        self.sources = []
+        # Keyword to parser table, looked up once per line
+        self.parsers = {
+            "show": self.parse_show,
+            "variable": self.parse_variable,
+            "add": self.parse_add,
+            "subtract": self.parse_subtract,
+            "multiply": self.parse_multiply,
+            "divide": self.parse_divide,
+            "take": self.parse_take,
+            "read": self.parse_read,
+            "write": self.parse_write,
+            "append": self.parse_append,
+            "if": self.parse_if,
+            "end": self.parse_end,
+            "define": self.parse_define,
+            "function": self.parse_function,
+            "change": self.parse_change,
+            "native": self.parse_native,
+            "run": self.parse_run,
+            "foreach": self.parse_foreach,
+            "repeat": self.parse_repeat,
+            "include": self.parse_include
+        }
+
+    def announce(self):
+        self.logger.logNormal("Starting to read the file!\n")
+        print(self.colors.HEADER + "\n    [[ STARTING COMPILATION TO BINARY ]]    ")
+        print(self.colors.OKBLUE + "\nREADING MAIN CODE FILE...")
+
+    def load(self, file_name=None):
+        '''
+        Returns the statements of a file of ELang code. Unless Elpc is off
+        they come from its cached .elpc while the code is unchanged.
+        '''
+        self.compiled = None
+        self.sources = [str(file_name or self.filename)]
+        if file_name == None or not self.config.get("Elpc", True):
+            program = list(self.parse(self.reader(file_name)))
+            if not modules.includes(program):
+                return program
+            # Every module is parsed again, nothing is cached
+            loader = modules.Loader(self, cache=False)
+            linked = loader.load(file_name or self.filename, elpc.Compiled(None, None, program))
+            self.sources = list(loader.graph)
+            return linked.program
+        if not str(file_name).endswith(".elpp") or (not isfile(str(file_name)) and not isfile(elpc.compiled_path(file_name))):
+            # The reader reports what is wrong or missing
+            return list(self.parse(self.reader(file_name)))
+
+        self.announce()
+        self.compiled = elpc.load(self, file_name)
+        if self.compiled == None:
+            return []
+        parsed = self.compiled.changed
+        if modules.includes(self.compiled.program):
+            self.compiled.save()
+            loader = modules.Loader(self)
+            self.compiled = loader.load(file_name, self.compiled)
+            self.sources = list(loader.graph)
+            parsed = parsed or loader.parsed
+        if parsed:
+            # Only parsing again adds to the cache
+            elpc.evict(self.config)
+        return self.compiled.program
+
+    def optimize(self, program):
+        '''
+        Optimizes program, taking the result from the .elpc it was loaded
+        from when it has one and saving it there otherwise
+        '''
+        if self.compiled == None or self.compiled.program is not program:
+            return optimize.run(program, self.config)
+        reply = self.compiled.optimize(self.config)
+        self.compiled.save()
+        return reply
+
+    def reader(self, file_name=None):
+        '''
+        This function is for reading file of ELang code...
+        It yields the file line by line so only one line is held at a time
+        '''
+        self.announce()
+        if file_name == None:
+            self.logger.logNormal("FileName Not Given By The Compiler!\n")
+            print("\nFILENAME HAS NOT BE GIVEN BY THE COMPILER!")
+            print("\nTRYING TO READ THE DEFAULT CODE FILE")
+            file_name = self.filename
+        else:
+            # Reading the file extention
+            extention = str(file_name)[-4:]
+            if extention != "elpp":
+                # If file extention is wrong:
+                self.error("ERR: WRONG FILE EXTENTION FOR {}! \nMUST BE: .elpp".format(str(file_name)))
+                return
+
+        PATH = abspath(str(file_name))
+        if not isfile(PATH):
+            # If file_name does not exist:
+            self.error("ERR: FILE {} DOES NOT EXIST!".format(str(file_name)))
+            return
+
+        try:
+            with open(PATH, "r") as f:
+                for line in f:
+                    yield line
+        except FileNotFoundError:
+            self.error("ERR: FILE {} NOT FOUND!".format(str(file_name)))
+
+    def error(self, message):
+        self.errors.append(message)
+        if not self.quiet:
+            print(message)
+
+    def parse(self, lines):
+        '''
+        Turns lines of ELang code into commands in a single pass, blank lines
+        and lines without a keyword are skipped on the way
+        '''
+        number = 0
+        for line in lines:
+            number += 1
+            words = line.split()
+            if not words:
+                continue
+
+            # Check if first word is a keyword!
+            handler = self.parsers.get(words[0].lower())
+            if handler == None:
+                continue
+
+            # Everything after the keyword and its space is the argument
+            argument = line.lstrip()[len(words[0]) + 1:].rstrip("\r\n")
+            try:
+                yield handler(argument, words[1:])
+            except IndexError:
+                self.error("ERR: MISSING ARGUMENTS FOR {} ON LINE {}!".format(words[0], number))
+
+    def parse_show(self, argument, o):
+        return ir.Show(argument)
+
+    def parse_variable(self, argument, o):
+        var_data = argument.replace(str(o[0] + " "), "", 1)
+        var_data = var_data.replace(str(o[1]) + " ", "", 1)
+        return ir.Var(o[0], var_data)
+
+    def parse_add(self, argument, o):
+        return ir.Add(o[0], o[2], o[4])
+
+    def parse_subtract(self, argument, o):
+        return ir.Sub(o[0], o[2], o[4])
+
+    def parse_multiply(self, argument, o):
+        return ir.Mul(o[0], o[2], o[4])
+
+    def parse_divide(self, argument, o):
+        return ir.Div(o[0], o[2], o[4])
+
+    def parse_take(self, argument, o):
+        return ir.Take(o[0], o[1])
+
+    def parse_read(self, argument, o):
+        return ir.Read(o[0], o[2])
+
+    def parse_write(self, argument, o):
+        return ir.Write(o[0], o[2])
+
+    def parse_append(self, argument, o):
+        return ir.Append(o[0], o[2])
+
+    def parse_if(self, argument, o):
+        return ir.If(o[0], o[1], o[2])
+
+    def parse_end(self, argument, o):
+        return ir.End()
+
+    def parse_define(self, argument, o):
+        return ir.Define(o[0], o[2:])
+
+    def parse_function(self, argument, o):
+        return ir.Call(o[0], o[1:])
+
+    def parse_change(self, argument, o):
+        return ir.Change(o[0], o[2])
+
+    def parse_native(self, argument, o):
+        return ir.Native(argument)
+
+    def parse_run(self, argument, o):
+        return ir.Run(argument)
+
+    def parse_foreach(self, argument, o):
+        return ir.Foreach(o[0], o[2])
+
+    def parse_repeat(self, argument, o):
+        return ir.Repeat(o[0])
+
+    def parse_include(self, argument, o):
+        return ir.Include(o[0])
@@ -0,0 +1,260 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Translate time knowledge of variables, shared by every language. The
+    statements of a program are resolved in program order, keeping what
+    the generated code would know about its variables while it is written,
+    and handed to the language with everything it needs to write or run
+    them. Languages resolving the same way can't drift apart.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+from core import ir
+from core.parser import Parser
+
+
+class Resolver(Parser):
+    '''
+    This is a base class for languages. A language writes or runs the
+    resolved statements in these methods:
+        emit_show(text, variable)
+        emit_var(name, data)
+        emit_calc(target, op, left, right, declare)
+        emit_text(target, text, count, declare)
+        emit_take(kind, name, existing)
+        emit_read(target, file_name, declare)
+        emit_write(file_name, data, mode)
+        emit_if(left, op, right)
+        emit_define(node)
+        emit_call(node)
+        emit_change(node)
+        emit_native(node)
+        emit_run(node)
+        emit_foreach(var, file_name)
+        emit_repeat(count)
+        close(kind)
+    Blocks are opened by pushing their kind on self.blocks.
+    '''
+    def __init__(self, logger, colors):
+        Parser.__init__(self, logger, colors)
+        # IR statement to resolver table
+        self.resolvers = {
+            ir.Show: self.show,
+            ir.Var: self.var,
+            ir.Add: self.add,
+            ir.Sub: self.sub,
+            ir.Mul: self.mul,
+            ir.Div: self.div,
+            ir.Take: self.take,
+            ir.Read: self.read,
+            ir.Write: self.write,
+            ir.Append: self.append,
+            ir.If: self.if_statement,
+            ir.End: self.end,
+            ir.Define: self.define,
+            ir.Call: self.function,
+            ir.Change: self.change,
+            ir.Native: self.native,
+            ir.Run: self.run,
+            ir.Foreach: self.foreach,
+            ir.Repeat: self.repeat,
+            ir.Include: self.include
+        }
+
+    def reset(self, config=None):
+        '''
+        Forgets everything known about the last program
+        '''
+        if config != None:
+            self.config = config
+        self.errors = []
+        self.vars = {}
+        self.func_var = {}
+        self.func = False
+        # Kind of every block still open, innermost last
+        self.blocks = []
+
+    def resolve(self, program):
+        for node in program:
+            self.resolvers[type(node)](node)
+
+    def names(self):
+        # Functions only know their own variables
+        if self.func:
+            return self.func_var
+        return self.vars
+
+    def show(self, node):
+        self.emit_show(node.text, node.text in self.names())
+
+    def var(self, node):
+        self.names()[node.name] = node.value
+
+        try:
+            data = int(node.value)
+        except ValueError:
+            data = node.value
+        self.emit_var(node.name, data)
+
+    def add(self, node):
+        data_on_var = node.target in self.vars
+
+        try:
+            data0 = int(node.left)
+            data1 = int(node.right)
+        except ValueError:
+            data0 = node.left
+            data1 = node.right
+
+        if not data_on_var:
+            self.vars[node.target] = data0 + data1
+        self.emit_calc(node.target, "+", str(data0), str(data1), not data_on_var)
+
+    def sub(self, node):
+        data_on_var = node.target in self.vars
+        data0 = self.vars.get(node.left, node.left)
+        data1 = self.vars.get(node.right, node.right)
+
+        if not data_on_var:
+            try:
+                self.vars[node.target] = data0 - data1
+            except (ValueError, TypeError):
+                self.vars[node.target] = str(data0) + str(data1)
+        self.emit_calc(node.target, "-", str(data0), str(data1), not data_on_var)
+
+    def mul(self, node):
+        data_on_var = node.target in self.vars
+        left = self.vars.get(node.left, node.left)
+        right = self.vars.get(node.right, node.right)
+
+        try:
+            data0 = int(left)
+            data1 = int(right)
+            type_of_data = "int"
+        except ValueError:
+            data0 = left
+            data1 = right
+            type_of_data = "string"
+
+        try:
+            data1 = int(data1)
+        except ValueError:
+            # A string can only be repeated by a number
+            return
+
+        if type_of_data == "string":
+            if not data_on_var:
+                self.vars[node.target] = str(data0) * data1
+            self.emit_text(node.target, str(data0), data1, not data_on_var)
+        else:
+            if not data_on_var:
+                self.vars[node.target] = data0 * data1
+            self.emit_calc(node.target, "*", str(data0), str(data1), not data_on_var)
+
+    def div(self, node):
+        data_on_var = node.target in self.vars
+        left = self.vars.get(node.left, node.left)
+        right = self.vars.get(node.right, node.right)
+
+        try:
+            data0 = int(left)
+            data1 = int(right)
+        except ValueError:
+            data0 = left
+            data1 = right
+
+        if not data_on_var:
+            try:
+                self.vars[node.target] = data0 / data1
+            except (ValueError, TypeError, ZeroDivisionError):
+                self.vars[node.target] = ""
+        # "divide a by b in c" divides b by a
+        self.emit_calc(node.target, "/", str(data1), str(data0), not data_on_var)
+
+    def take(self, node):
+        existing = node.type in self.vars
+        if not existing:
+            self.vars[node.name] = ""
+        self.emit_take(node.type, node.name, existing)
+
+    def read(self, node):
+        if node.target in self.vars:
+            self.emit_read(node.target, node.file, False)
+        else:
+            self.vars[node.target] = ""
+            self.emit_read(node.target, '"' + node.file + '"', True)
+
+    def write(self, node):
+        if node.var not in self.vars:
+            self.error("ERR: YOU NEED A VARIABLE TO WRITE DATA ON FILE! ERR ON {}, {}".format(node.var, node.file))
+            return
+        self.emit_write(node.file, str(self.vars[node.var]), "w")
+
+    def append(self, node):
+        if node.var not in self.vars:
+            self.error("ERR: YOU NEED A VARIABLE TO APPEND DATA ON FILE! ERR ON {}, {}".format(node.var, node.file))
+            return
+        self.emit_write(node.file, str(self.vars[node.var]), "a")
+
+    def operand(self, value):
+        '''
+        Variables and numbers are used as they are, anything else is a string
+        '''
+        if value in self.vars:
+            return value
+        try:
+            return str(int(value))
+        except ValueError:
+            return '"' + value + '"'
+
+    def if_statement(self, node):
+        self.emit_if(self.operand(node.left), node.op, self.operand(node.right))
+
+    def end(self, node):
+        kind = None
+        if self.blocks:
+            kind = self.blocks.pop()
+        if kind == "define" or kind == "function":
+            self.func = False
+        self.close(kind)
+
+    def define(self, node):
+        self.func = True
+        self.func_var = {}
+        for i in node.args:
+            self.func_var[i] = ""
+        self.emit_define(node)
+
+    def function(self, node):
+        self.emit_call(node)
+
+    def change(self, node):
+        self.emit_change(node)
+
+    def native(self, node):
+        self.emit_native(node)
+
+    def run(self, node):
+        self.emit_run(node)
+
+    def foreach(self, node):
+        names = self.names()
+        if node.file in names:
+            file_name = node.file
+        else:
+            file_name = '"' + node.file + '"'
+        names[node.var] = ""
+        self.emit_foreach(node.var, file_name)
+
+    def repeat(self, node):
+        if node.count not in self.names():
+            try:
+                int(node.count)
+            except ValueError:
+                self.error("ERR: REPEAT NEEDS A NUMBER OR A VARIABLE! ERR ON {}".format(node.count))
+        self.emit_repeat(node.count)
+
+    def include(self, node):
+        # Includes are replaced by their files when a program file is loaded
+        self.error("ERR: INCLUDE ONLY WORKS IN PROGRAM FILES! ERR ON {}".format(node.file))
@@ -0,0 +1,75 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Tests of ELang as a library: calls from many threads at once give what
+    they give one after the other and never see each other's settings or
+    errors.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import shutil
+import subprocess
+import unittest
+
+from core import api
+
+# Programs with their settings, the broken one has an error of its own
+CALLS = [
+    ("show Hello World!\n", {"FastIO": False}),
+    ("variable x = 4\nmultiply x by 3 in y\nshow y\n", {"Optimize": False}),
+    ("variable x = 4\nmultiply x by 3 in y\nshow y\n", {"Optimize": True}),
+    ("repeat 3\nshow again\nend\n", {}),
+    ("define greet with name\nshow name\nend\nvariable who = you\nfunction greet who\n", {"Profile": "debug"}),
+    ("write missing to out.txt\nshow broken\n", {})
+]
+
+
+def translate(call):
+    source, config = call
+    errors = []
+    return api.translate(source, config, errors), errors
+
+
+def run(call):
+    source, config = call
+    binary = api.build(source, config)
+    try:
+        return subprocess.run([binary], stdout=subprocess.PIPE, check=True).stdout
+    finally:
+        shutil.rmtree(os.path.dirname(binary), ignore_errors=True)
+
+
+class ApiTest(unittest.TestCase):
+    def test_concurrent_translate(self):
+        calls = CALLS * 20
+        serial = [translate(i) for i in calls]
+        with ThreadPoolExecutor(8) as pool:
+            concurrent = list(pool.map(translate, calls))
+        self.assertEqual(concurrent, serial)
+
+        for (source, config), (code, errors) in zip(calls, concurrent):
+            if "missing" in source:
+                self.assertEqual(len(errors), 1)
+            else:
+                self.assertEqual(errors, [])
+
+    def test_config_untouched(self):
+        config = {"FastIO": False}
+        api.translate("show Hello\n", config)
+        self.assertEqual(config, {"FastIO": False})
+
+    @unittest.skipUnless(shutil.which("g++"), "g++ is needed to build the programs")
+    def test_concurrent_build(self):
+        calls = CALLS[:-1] * 2
+        serial = [run(i) for i in calls]
+        with ThreadPoolExecutor(4) as pool:
+            concurrent = list(pool.map(run, calls))
+        self.assertEqual(concurrent, serial)
+        self.assertEqual(serial[1], b"12\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Tests of batch builds: every file gets a result, whatever is wrong
+    with it, and the project is never generated.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from core.misc import batch, helper, logger, EUtil
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="elang-test-")
+        self.cwd = os.getcwd()
+        os.chdir(self.folder)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write(self, name, code):
+        with open(name, "w") as f:
+            f.write(code)
+        return name
+
+    def test_settings_generate_nothing(self):
+        checkup = helper.Checkup(logger.NullLog(), EUtil)
+        config = checkup.settings()
+        self.assertEqual(config["language"], "c++")
+        self.assertEqual(os.listdir("."), [])
+
+        self.write("config.yml", "Name: compile\nProfile: fastest\n")
+        self.assertFalse(checkup.settings())
+
+    @unittest.skipUnless(shutil.which("g++"), "g++ is needed to build the programs")
+    def test_results(self):
+        files = [
+            self.write("good.elpp", "show Hello\n"),
+            self.write("broken.elpp", "write nothing on out.txt\n"),
+            self.write("wrong.txt", "show Hello\n"),
+            "missing.elpp"
+        ]
+        config = {"G++Path": "g++", "Flags": "", "Profile": "debug", "CompileOnly": False, "Runtime": "inline"}
+        Batch = batch.Batch(config, 2)
+
+        results = {i["file"]: i for i in Batch.run(files)}
+        self.assertEqual(results["good.elpp"]["status"], "ok")
+        for name in files[1:]:
+            self.assertEqual(results[name]["status"], "failed")
+            self.assertTrue(results[name]["output"])
+        self.assertIn("VARIABLE", results["broken.elpp"]["output"])
+        self.assertFalse(os.path.exists("broken"))
+        self.assertEqual(subprocess.run([os.path.abspath("good")], stdout=subprocess.PIPE).stdout, b"Hello\n")
+
+        os.remove("good")
+        self.assertEqual(Batch.run(["good.elpp"])[0]["status"], "cached")
+        self.assertTrue(os.path.isfile("good"))
+
+
+if __name__ == "__main__":
+    unittest.main()
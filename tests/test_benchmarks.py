@@ -0,0 +1,59 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Tests of the generator of benchmark programs: what it writes has to be
+    a valid ELang program of the size and mix asked for.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks import generate
+from core import api
+
+
+def program(size, mix=None, seed=0):
+    return "".join(generate.Generator(mix, seed).statements(size))
+
+
+class GenerateTest(unittest.TestCase):
+    def test_size_and_seed(self):
+        source = program(500)
+        self.assertGreaterEqual(len(source.splitlines()), 500)
+        self.assertEqual(source, program(500))
+        self.assertNotEqual(source, program(500, seed=1))
+
+    def test_mix(self):
+        mix = generate.parse_mix("show=1,if=1")
+        self.assertEqual(mix["arithmetic"], 0)
+        keywords = {line.split()[0] for line in program(200, mix).splitlines()}
+        self.assertEqual(keywords, {"show", "if", "end"})
+        self.assertRaises(ValueError, generate.parse_mix, "loop=1")
+
+    def test_write_file(self):
+        folder = tempfile.mkdtemp(prefix="elang-test-")
+        try:
+            path = os.path.join(folder, "bench.elpp")
+            generate.generate(path, 100, seed=3)
+            with open(path) as f:
+                self.assertEqual(f.read(), program(100, seed=3))
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    def test_valid(self):
+        errors = []
+        api.translate(program(2000), errors=errors)
+        self.assertEqual(errors, [])
+
+    @unittest.skipUnless(shutil.which("g++"), "g++ is needed to build the programs")
+    def test_builds(self):
+        binary = api.build(program(300), {"Profile": "debug"})
+        shutil.rmtree(os.path.dirname(binary), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Tests of the build cache and its eviction.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.languages import cpp
+from core.misc import cache, helper, logger
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="elang-test-")
+        self.cwd = os.getcwd()
+        os.chdir(self.folder)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def config(self, **settings):
+        config = {
+            "Name": "program",
+            "FileName": "program.elpp",
+            "G++Path": "g++",
+            "Flags": "",
+            "Profile": "debug",
+            "CompileOnly": False,
+            "Runtime": "inline"
+        }
+        config.update(settings)
+        return config
+
+    def test_store_and_restore(self):
+        buildCache = cache.BuildCache(self.config())
+        with open("binary", "w") as f:
+            f.write("binary")
+
+        key = buildCache.key("digest")
+        self.assertFalse(buildCache.has(key))
+        self.assertFalse(buildCache.restore(key, "restored"))
+        buildCache.store(key, "binary")
+        self.assertTrue(buildCache.has(key))
+        self.assertTrue(buildCache.restore(key, "restored"))
+        with open("restored") as f:
+            self.assertEqual(f.read(), "binary")
+
+    def test_evict_least_recently_used(self):
+        os.makedirs("entries/folder")
+        for name, mtime in (("old", 1), ("new", 3)):
+            with open(os.path.join("entries", name), "w") as f:
+                f.write("x" * 100)
+            os.utime(os.path.join("entries", name), (mtime, mtime))
+        with open("entries/folder/data", "w") as f:
+            f.write("x" * 100)
+        os.utime("entries/folder", (2, 2))
+
+        cache.evict("entries", 150)
+        self.assertEqual(sorted(os.listdir("entries")), ["new"])
+
+    def test_split_functions_skipped_on_hit(self):
+        with open("program.elpp", "w") as f:
+            f.write("define greet with name\nshow name\nend\nvariable x = you\nfunction greet x\n")
+        config = self.config(SplitFunctions=True)
+        ELangObject = cpp.ELang(config, logger.NullLog, helper.bcolors())
+        ELangObject.build_cache = cache.BuildCache(config)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ELangObject.compile()
+            with open("binary", "w") as f:
+                f.write("binary")
+            ELangObject.build_cache.store(ELangObject.build_cache.key(ELangObject.digest), "binary")
+            shutil.rmtree(os.path.join(".elang_cache", "objects"), ignore_errors=True)
+            command = ELangObject.compile()[0]
+
+        self.assertFalse(os.path.isdir(os.path.join(".elang_cache", "objects")))
+        self.assertFalse(any(str(i).endswith(".o") for i in command))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Tests of the C++ generated for single statements.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import shutil
+import subprocess
+import unittest
+
+from core import api
+
+
+def output(source):
+    binary = api.build(source, {"Profile": "debug"})
+    try:
+        return subprocess.run([binary], stdout=subprocess.PIPE, check=True).stdout
+    finally:
+        shutil.rmtree(binary.rsplit("/", 1)[0], ignore_errors=True)
+
+
+class CppTest(unittest.TestCase):
+    def test_native_after_output(self):
+        code = api.translate('show first\nnative printf("second\\n");\n')
+        self.assertLess(code.index("cout.flush();"), code.index('printf("second\\n");'))
+
+    @unittest.skipUnless(shutil.which("g++"), "g++ is needed to run the programs")
+    def test_native_order(self):
+        # What the native code prints itself is up to it to flush
+        code = 'show first\nnative printf("second\\n"); fflush(stdout);\nshow third\n'
+        self.assertEqual(output(code), b"first\nsecond\nthird\n")
+
+    @unittest.skipUnless(shutil.which("g++"), "g++ is needed to run the programs")
+    def test_multiply_text(self):
+        code = "variable word = ab\nmultiply word by 3 in line\nshow line\n"
+        self.assertEqual(output(code), b"ababab\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
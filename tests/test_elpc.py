@@ -0,0 +1,99 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Tests of the .elpc format and of the cache of parsed programs.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from core import elpc, ir
+from core.languages import cpp
+from core.parser import Parser
+from core.misc import helper, logger
+
+SOURCE = "variable x = 2\nadd x and 3 in y\nshow y\n"
+
+
+class ElpcTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="elang-test-")
+        self.cwd = os.getcwd()
+        os.chdir(self.folder)
+        self.parser = Parser(logger.NullLog, helper.bcolors())
+        self.parser.quiet = True
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write(self, name, code):
+        folder = os.path.dirname(name)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(name, "w") as f:
+            f.write(code)
+        return name
+
+    def translate(self, name):
+        ELangObject = cpp.ELang({"FileName": name, "Name": "program", "Runtime": "inline"}, logger.NullLog, helper.bcolors())
+        ELangObject.quiet = True
+        with contextlib.redirect_stdout(io.StringIO()):
+            ELangObject.reset()
+            program = ELangObject.optimize(ELangObject.load(name))
+        return ELangObject, program
+
+    def test_cached_aside(self):
+        self.write("main.elpp", SOURCE)
+        compiled = elpc.load(self.parser, "main.elpp")
+        self.assertTrue(compiled.changed)
+        compiled.save()
+
+        self.assertFalse(os.path.exists("main.elpc"))
+        self.assertEqual(os.path.dirname(compiled.path), elpc.cache_folder())
+        self.assertTrue(os.path.isfile(compiled.path))
+
+        again = elpc.load(self.parser, "main.elpp")
+        self.assertFalse(again.changed)
+        self.assertEqual([type(i) for i in again.program], [ir.Var, ir.Add, ir.Show])
+
+        self.write("main.elpp", SOURCE + "show more\n")
+        self.assertTrue(elpc.load(self.parser, "main.elpp").changed)
+
+    def test_same_names(self):
+        self.assertNotEqual(elpc.cached_path("one/main.elpp"), elpc.cached_path("two/main.elpp"))
+        self.assertEqual(elpc.cached_path("main.elpp"), elpc.cached_path(os.path.abspath("main.elpc")))
+
+    def test_shipped(self):
+        self.write("main.elpp", SOURCE)
+        shipped = elpc.parse(self.parser, "main.elpp", elpc.compiled_path("main.elpp"))
+        shipped.save()
+        os.remove("main.elpp")
+        with open("main.elpc", "rb") as f:
+            data = f.read()
+
+        ELangObject, program = self.translate("main.elpp")
+        self.assertEqual(ELangObject.errors, [])
+        self.assertEqual([type(i) for i in program], [ir.Show])
+        # Only the cache learns the optimized statements
+        with open("main.elpc", "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertIsNotNone(elpc.read(elpc.cached_path("main.elpp")).optimized)
+
+    def test_header(self):
+        data = elpc.Compiled("main.elpc", "digest", [ir.Show("x")]).dumps()
+        self.assertEqual(elpc.loads(data).program[0].text, "x")
+        for version in (elpc.HEADER[:4] + b"\0" + elpc.HEADER[5:], elpc.HEADER[:5] + b"\x02\x07"):
+            self.assertIsNone(elpc.loads(version + data[len(elpc.HEADER):]))
+        self.assertIsNone(elpc.loads(data[:-3]))
+        self.assertIsNone(elpc.loads(b"not a program"))
+
+
+if __name__ == "__main__":
+    unittest.main()
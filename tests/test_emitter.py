@@ -0,0 +1,85 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Tests of the code emitter, run with: python -m unittest discover tests
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import hashlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from core import api, ir
+from core.emitter import Emitter, Digest
+from core.languages import cpp
+from core.misc import helper, logger
+
+# Statements of the large program and the seconds its emission may take,
+# far above what a linear emitter needs so only quadratic copying fails it
+STATEMENTS = 1000000
+BUDGET = 5.0
+
+
+class EmitterTest(unittest.TestCase):
+    def test_targets(self):
+        text = io.StringIO()
+        binary = io.BytesIO()
+        digest = Digest()
+        out = Emitter(text, binary, digest)
+        out.write("int main(){")
+        out.writelines(["\n    return 0;", "\n}"])
+
+        code = "int main(){\n    return 0;\n}"
+        self.assertEqual(text.getvalue(), code)
+        self.assertEqual(binary.getvalue(), code.encode("utf-8"))
+        self.assertEqual(out.getvalue(), None)
+
+        memory = Emitter()
+        memory.write(code)
+        self.assertEqual(memory.getvalue(), code)
+
+    def test_finalize_targets(self):
+        ELangObject = cpp.ELang(api.settings(), logger.NullLog, helper.bcolors())
+        ELangObject.generate([ir.Var("name", "you"), ir.Show("Hello"), ir.Show("name"), ir.Repeat("3"), ir.Show("again"), ir.End()])
+        code = ELangObject.finalize()
+
+        # A file, as kept with KeepCpp
+        handle, path = tempfile.mkstemp(suffix=".cpp")
+        os.close(handle)
+        try:
+            with open(path, "w") as f:
+                ELangObject.finalize(f)
+            with open(path) as f:
+                self.assertEqual(f.read(), code)
+        finally:
+            os.remove(path)
+
+        # The stdin pipe of a process, as for the compiler
+        echo = "import sys; sys.stdout.buffer.write(sys.stdin.buffer.read())"
+        process = subprocess.Popen([sys.executable, "-c", echo], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        digest = Digest()
+        ELangObject.finalize(process.stdin, digest)
+        out = process.communicate()[0]
+        self.assertEqual(out.decode("utf-8"), code)
+        self.assertEqual(digest.hexdigest(), hashlib.sha256(code.encode("utf-8")).hexdigest())
+
+    def test_large_program(self):
+        ELangObject = cpp.ELang(api.settings(), logger.NullLog, helper.bcolors())
+        ELangObject.generate([ir.Show("Hello World!")] * STATEMENTS)
+
+        start = time.perf_counter()
+        code = ELangObject.finalize()
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(code.count('cout << "Hello World!"'), STATEMENTS)
+        self.assertLess(elapsed, BUDGET, "EMITTING {} STATEMENTS TOOK {:.2f}s".format(STATEMENTS, elapsed))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Tests of the interpreter, which has to behave like the built program.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from core import api
+from core.languages import interpret
+from core.misc import helper, logger
+
+# Programs with their input, run by the interpreter and built alike
+PROGRAMS = {
+    "arithmetic": ("add 2 and 3 in a\nsubtract a from 10 in b\nmultiply b by 4 in c\ndivide 3 by c in d\nshow a\nshow b\nshow c\nshow d\n", ""),
+    "take": ("take string name\ntake int age\nshow name\nshow age\n", "Ada Lovelace\n36\n"),
+    "functions": ("define greet with who\nshow who\nend\nvariable x = you\nfunction greet x\nfunction greet x\n", ""),
+    "repeat": ("variable n = 3\nrepeat n\nshow hi\nend\n", ""),
+    "text": ("variable w = ab\nmultiply w by 3 in t\nshow t\n", ""),
+    "if": ("variable x = 4\nif x > 2 then\nshow big\nend\nif x == 2 then\nshow two\nend\n", "")
+}
+
+
+def output(source, optimize=True, stdin=""):
+    out = io.StringIO()
+    ELangObject = interpret.ELang({"Optimize": optimize}, logger.NullLog, helper.bcolors(), stdin=io.StringIO(stdin), stdout=out)
+    ELangObject.quiet = True
+    status = ELangObject.interpret(source.splitlines(True))
+    return status, out.getvalue()
+
+
+def errors(source):
+    ELangObject = interpret.ELang({}, logger.NullLog, helper.bcolors(), stdin=io.StringIO(), stdout=io.StringIO())
+    ELangObject.quiet = True
+    return ELangObject.interpret(source.splitlines(True)), ELangObject.errors
+
+
+class InterpretTest(unittest.TestCase):
+    def test_block_scopes(self):
+        # Names declared in a block are its own, assignments reach outside
+        source = (
+            "variable x = 1\nif 1 == 1 then\nvariable x = 2\nshow x\nend\nshow x\n"
+            "repeat 2 times\nvariable y = inner\nchange x = 5\nend\nshow x\n"
+        )
+        for optimize in (True, False):
+            with self.subTest(optimize=optimize):
+                self.assertEqual(output(source, optimize), (0, "2\n1\n5\n"))
+
+    def test_block_variable_ends_with_block(self):
+        status, text = output("if 1 == 1 then\nvariable y = 1\nend\nchange y = 2\n", False)
+        self.assertEqual(status, 1)
+
+    def test_files(self):
+        folder = tempfile.mkdtemp(prefix="elang-test-")
+        cwd = os.getcwd()
+        os.chdir(folder)
+        try:
+            source = (
+                "variable a = first\nwrite a to lines.txt\nappend a to lines.txt\n"
+                "read lines.txt to all\nshow all\nforeach line in lines.txt\nshow line\nend\n"
+            )
+            status, text = output(source)
+            self.assertEqual(status, 0)
+            self.assertEqual(text, "firstfirst\nfirstfirst\n")
+            with open("lines.txt") as f:
+                self.assertEqual(f.read(), "firstfirst")
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(folder, ignore_errors=True)
+
+    def test_run(self):
+        self.assertEqual(output("show before\nrun echo ran\nshow after\n"), (0, "before\nran\nafter\n"))
+
+    def test_errors(self):
+        self.assertEqual(errors("native cout << 1;\nshow x\n")[0], 1)
+        self.assertEqual(errors("divide 0 by 5 in d\nshow d\n"), (1, ["ERR: DIVISION BY ZERO IN d"]))
+        self.assertEqual(errors("function nope x\n"), (1, ["ERR: FUNCTION nope IS NOT DEFINED"]))
+
+    @unittest.skipUnless(shutil.which("g++"), "g++ is needed to run the programs")
+    def test_same_as_built(self):
+        for name, (source, stdin) in PROGRAMS.items():
+            with self.subTest(name):
+                binary = api.build(source, {"Profile": "debug"})
+                try:
+                    built = subprocess.run([binary], input=stdin.encode("utf-8"), stdout=subprocess.PIPE).stdout
+                finally:
+                    shutil.rmtree(os.path.dirname(binary), ignore_errors=True)
+                self.assertEqual(output(source, stdin=stdin), (0, built.decode("utf-8")))
+
+
+if __name__ == "__main__":
+    unittest.main()
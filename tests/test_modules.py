@@ -0,0 +1,101 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Tests of include: programs made of modules are linked once per module,
+    cycles are reported and a changed module reaches every file including
+    it.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from core import ir, modules
+from core.languages import cpp
+from core.misc import helper, logger
+
+
+class ModulesTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="elang-test-")
+        self.cwd = os.getcwd()
+        os.chdir(self.folder)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write(self, name, code):
+        folder = os.path.dirname(name)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(name, "w") as f:
+            f.write(code)
+        # Changes within the same tick of the clock are still seen
+        stamp = time.time() + len(code)
+        os.utime(name, (stamp, stamp))
+
+    def load(self, **settings):
+        config = {"FileName": "main.elpp", "Name": "main", "Runtime": "inline", "Optimize": False}
+        config.update(settings)
+        ELangObject = cpp.ELang(config, logger.NullLog, helper.bcolors())
+        ELangObject.quiet = True
+        with contextlib.redirect_stdout(io.StringIO()):
+            ELangObject.reset()
+            program = ELangObject.optimize(ELangObject.load("main.elpp"))
+        return ELangObject, program
+
+    def shown(self, program):
+        return [i.text for i in program if type(i) == ir.Show]
+
+    def test_link_once(self):
+        self.write("main.elpp", "include lib/a.elpp\ninclude lib/b.elpp\nshow main\n")
+        self.write("lib/a.elpp", "include b.elpp\nshow a\n")
+        self.write("lib/b.elpp", "show b\n")
+        ELangObject, program = self.load()
+        self.assertEqual(ELangObject.errors, [])
+        self.assertEqual(self.shown(program), ["b", "a", "main"])
+        self.assertEqual(len(ELangObject.sources), 3)
+
+    def test_cycle(self):
+        self.write("main.elpp", "include a.elpp\nshow main\n")
+        self.write("a.elpp", "include b.elpp\nshow a\n")
+        self.write("b.elpp", "include a.elpp\nshow b\n")
+        ELangObject, program = self.load()
+        self.assertEqual(len(ELangObject.errors), 1)
+        self.assertIn("INCLUDE CYCLE", ELangObject.errors[0])
+        self.assertIn("a.elpp -> ", ELangObject.errors[0])
+        self.assertEqual(self.shown(program), ["b", "a", "main"])
+
+    def test_changed_module(self):
+        self.write("main.elpp", "include lib/math.elpp\nshow main\n")
+        self.write("lib/math.elpp", "include consts.elpp\nshow math\n")
+        self.write("lib/consts.elpp", "show one\n")
+        ELangObject, program = self.load()
+        self.assertEqual(self.shown(program), ["one", "math", "main"])
+
+        self.write("lib/consts.elpp", "show two\n")
+        loader = modules.Loader(ELangObject)
+        with contextlib.redirect_stdout(io.StringIO()):
+            linked = loader.load("main.elpp")
+        # Only the changed module is parsed, everything including it is linked again
+        self.assertEqual(loader.parsed, [os.path.abspath("lib/consts.elpp")])
+        self.assertTrue(linked.changed)
+        self.assertEqual(self.shown(linked.program), ["two", "math", "main"])
+
+    def test_cache_size(self):
+        self.write("main.elpp", "include lib.elpp\nshow main\n")
+        for text in ("one", "two", "three"):
+            self.write("lib.elpp", "show {}\n".format(text))
+            self.load(CacheSize=0)
+        self.assertEqual(len(os.listdir(os.path.join(".elang_cache", "modules"))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Tests of the optimization passes: an optimized program has to print
+    what it prints without them.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import shutil
+import subprocess
+import unittest
+
+from core import api
+
+PROGRAMS = {
+    # A variable declared in an always true if shadows the one outside
+    "shadowing": "variable x = 1\nif 1 == 1 then\nvariable x = 2\nshow x\nend\nshow x\n",
+    "shadowing_native": "variable x = 1\nif 1 == 1 then\nvariable x = 2\nend\nnative cout << x << endl;\n",
+    # Subtract takes the value x was declared with, not the changed one
+    "changed_operand": "variable x = 5\nchange x = 9\nsubtract x from 10 in y\nshow y\n",
+    "folded": "add 2 and 3 in a\nmultiply a by 4 in b\nif 1 < 2 then\nshow b\nend\nshow a\n"
+}
+
+
+def output(source, optimize):
+    binary = api.build(source, {"Profile": "debug", "Optimize": optimize})
+    try:
+        return subprocess.run([binary], stdout=subprocess.PIPE, check=True).stdout
+    finally:
+        shutil.rmtree(binary.rsplit("/", 1)[0], ignore_errors=True)
+
+
+@unittest.skipUnless(shutil.which("g++"), "g++ is needed to run the programs")
+class OptimizeTest(unittest.TestCase):
+    def test_same_output(self):
+        for name, source in PROGRAMS.items():
+            with self.subTest(name):
+                self.assertEqual(output(source, True), output(source, False))
+
+    def test_shadowing(self):
+        self.assertEqual(output(PROGRAMS["shadowing"], True), b"2\n1\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Tests of the build profiles and of the pgo build.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from core.misc import profiles, runner
+
+CODE = "#include <iostream>\nint main(){ std::cout << \"trained\" << std::endl; return 0; }\n"
+
+
+class ProfilesTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="elang-test-")
+        self.cwd = os.getcwd()
+        os.chdir(self.folder)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_flags(self):
+        self.assertEqual(profiles.flags({"Profile": "debug", "Flags": "-Wall -g"}), ["-O0", "-Wall", "-g"])
+        self.assertRaises(ValueError, profiles.flags, {"Profile": "fastest"})
+
+    def test_trainer(self):
+        self.assertEqual(profiles.trainer({"PGOArgs": "a b"}, "prog"), ["prog", "a", "b"])
+        config = {"PGOArgs": "ignored", "PGOCommand": "python train.py --binary {binary}"}
+        self.assertEqual(profiles.trainer(config, "prog"), ["python", "train.py", "--binary", "prog"])
+        self.assertNotEqual(profiles.training(dict(config, Profile="pgo")), profiles.training({"Profile": "pgo"}))
+
+    @unittest.skipUnless(shutil.which("g++"), "g++ is needed to build the programs")
+    def test_pgo_command(self):
+        with open("main.cpp", "w") as f:
+            f.write(CODE)
+        command = ["g++", "-O2", "-o", "main", "main.cpp"]
+
+        # The training command runs the binary itself
+        config = {"Profile": "pgo", "PGOCommand": sys.executable + " -c \"import subprocess; subprocess.run(['{binary}'])\""}
+        shown = io.StringIO()
+        with contextlib.redirect_stdout(shown):
+            result = profiles.pgo_build(runner.Runner(), command, config, "main")
+        self.assertTrue(result.ok, result.stderr)
+        self.assertNotIn("NO PROFILE", shown.getvalue())
+
+        # A training that never runs the binary leaves no profile behind
+        config["PGOCommand"] = sys.executable + " -c pass"
+        shown = io.StringIO()
+        with contextlib.redirect_stdout(shown):
+            result = profiles.pgo_build(runner.Runner(), command, config, "main")
+        self.assertTrue(result.ok, result.stderr)
+        self.assertIn("NO PROFILE", shown.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
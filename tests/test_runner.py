@@ -0,0 +1,88 @@
+'''
+    COPYRIGHT 2019 Elham Aryanpur
+
+    Tests of the job runner: jobs and whatever they started never outlive
+    a timeout or an interrupt.
+
+    For license, Please refer to LICENSE file in the master branch.
+'''
+
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import unittest
+
+from core.misc import runner
+
+# Starts a child that sleeps, writes its pid to the file given and sleeps too
+JOB = '''
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+with open(sys.argv[1], "w") as f:
+    f.write(str(child.pid))
+time.sleep(60)
+'''
+
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    # A killed child of a finished job is left as a zombie of init
+    try:
+        with open("/proc/{}/stat".format(pid)) as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except OSError:
+        return True
+
+
+@unittest.skipIf(os.name == "nt", "jobs are stopped by process group")
+class RunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="elang-test-")
+        self.pid_file = os.path.join(self.folder, "pid")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def child(self):
+        with open(self.pid_file) as f:
+            return int(f.read())
+
+    def stopped(self, pid):
+        for i in range(50):
+            if not alive(pid):
+                return True
+            time.sleep(0.1)
+        return False
+
+    def test_output(self):
+        result = runner.Runner().run([sys.executable, "-c", "import sys; print(sys.stdin.read().upper())"], input="elang")
+        self.assertTrue(result.ok)
+        self.assertEqual(result.stdout, "ELANG\n")
+
+    def test_timeout(self):
+        result = runner.Runner(timeout=2).run([sys.executable, "-c", JOB, self.pid_file])
+        self.assertTrue(result.timed_out)
+        self.assertTrue(self.stopped(self.child()))
+
+    def test_interrupt(self):
+        def interrupt(signum, frame):
+            raise KeyboardInterrupt()
+        previous = signal.signal(signal.SIGALRM, interrupt)
+        signal.alarm(2)
+        try:
+            with self.assertRaises(KeyboardInterrupt):
+                runner.Runner().run([sys.executable, "-c", JOB, self.pid_file])
+        finally:
+            signal.alarm(0)
+            signal.signal(signal.SIGALRM, previous)
+        self.assertTrue(self.stopped(self.child()))
+
+
+if __name__ == "__main__":
+    unittest.main()